@@ -8,6 +8,7 @@ FiftyOne Brain operators.
 import base64
 from collections import defaultdict
 from datetime import datetime
+import glob
 import json
 from packaging.version import Version
 
@@ -992,11 +993,7 @@ class AddSimilarSamples(foo.Operator):
     def resolve_input(self, ctx):
         inputs = types.Object()
 
-        dataset_names = fo.list_datasets()
-
-        choices = types.AutocompleteView()
-        for name in dataset_names:
-            choices.add_choice(name, label=name)
+        choices, dataset_names = _get_dataset_choices(ctx, "src_dataset")
 
         inputs.enum(
             "src_dataset",
@@ -1187,6 +1184,43 @@ def search_by_text_similarity(ctx, inputs, src_dataset):
     return True
 
 
+_DATASET_CHOICES_LIMIT = 200
+
+
+def _get_dataset_choices(ctx, param):
+    # The current value is used as a server-side search prefix, unless it is
+    # already the name of a dataset, in which case all datasets are listed.
+    # Listings are not cached because the operators that create and delete
+    # datasets live in other plugins and could not invalidate them
+    value = ctx.params.get(param, None) or None
+
+    names = _list_datasets(prefix=value)
+    if value in names:
+        names = _list_datasets()
+
+    choices = names[:_DATASET_CHOICES_LIMIT]
+
+    # The current dataset is often the default value
+    for name in (value, getattr(ctx.dataset, "name", None)):
+        if name in names and name not in choices:
+            choices.append(name)
+
+    dataset_choices = types.AutocompleteView()
+    for name in choices:
+        dataset_choices.add_choice(name, label=name)
+
+    return dataset_choices, names
+
+
+def _list_datasets(prefix=None):
+    if prefix is not None:
+        glob_patt = glob.escape(prefix) + "*"
+    else:
+        glob_patt = None
+
+    return fo.list_datasets(glob_patt=glob_patt)
+
+
 class ComputeUniqueness(foo.Operator):
     @property
     def config(self):
@@ -9,6 +9,8 @@ import json
 
 from bson import json_util, ObjectId
 
+import eta.core.utils as etau
+
 import fiftyone as fo
 import fiftyone.operators as foo
 import fiftyone.operators.delegated as food
@@ -440,6 +442,7 @@ def _handle_info(ctx, inputs, selected_ops):
         tab_choices.add_choice("VIEW", label="View")
         tab_choices.add_choice("OUTPUTS", label="Outputs")
         tab_choices.add_choice("ERRORS", label="Errors")
+        tab_choices.add_choice("PROFILE", label="Profile")
 
         inputs.enum(
             "op_tab",
@@ -452,6 +455,13 @@ def _handle_info(ctx, inputs, selected_ops):
         request_params = op._doc["context"]["request_params"]
         result = op._doc.get("result", None)
 
+        # Profiled operations store their profile in their outputs
+        outputs = result["result"] if result else None
+        profile = None
+        if isinstance(outputs, dict) and "profile" in outputs:
+            outputs = dict(outputs)
+            profile = outputs.pop("profile")
+
         if tab == "INPUTS":
             op_inputs = format_code(request_params["params"])
             inputs.str(
@@ -476,7 +486,7 @@ def _handle_info(ctx, inputs, selected_ops):
                 params=view_params,
             )
         elif tab == "OUTPUTS":
-            op_outputs = format_code(result["result"]) if result else None
+            op_outputs = format_code(outputs)
             inputs.str(
                 "op_outputs",
                 default=op_outputs,
@@ -489,6 +499,13 @@ def _handle_info(ctx, inputs, selected_ops):
                 default=op_errors,
                 view=code_view if op_errors else kv_view,
             )
+        elif tab == "PROFILE":
+            op_profile = _format_profile(profile) if profile else None
+            inputs.str(
+                "op_profile",
+                default=op_profile,
+                view=code_view if op_profile else kv_view,
+            )
 
     inputs.bool(
         "show_raw",
@@ -598,6 +615,36 @@ def _handle_cleanup(ctx, inputs, selected_ops):
     return True
 
 
+def _format_profile(profile):
+    lines = [
+        "Wall time: %.3fs" % profile["wall_time"],
+        "Peak memory: %s"
+        % etau.to_human_bytes_str(profile["peak_memory_bytes"]),
+    ]
+
+    phases = profile.get("phases", None)
+    if phases:
+        lines.extend(["", "Phases:"])
+        width = max(len(name) for name in phases)
+        for name, duration in phases.items():
+            lines.append("  %s  %.3fs" % (name.ljust(width), duration))
+
+    hotspots = profile.get("hotspots", None)
+    if hotspots:
+        lines.extend(["", "Top hotspots by cumulative time:"])
+        lines.append(
+            "  %8s %10s %10s  %s"
+            % ("ncalls", "tottime", "cumtime", "function")
+        )
+        for h in hotspots:
+            lines.append(
+                "  %8d %10.3f %10.3f  %s"
+                % (h["ncalls"], h["tottime"], h["cumtime"], h["function"])
+            )
+
+    return "\n".join(lines)
+
+
 def _parse_op_view(request_params):
     ctx = foo.ExecutionContext(request_params=request_params)
     dataset = ctx.dataset
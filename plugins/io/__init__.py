@@ -6,10 +6,22 @@ I/O operators.
 |
 """
 import base64
+import collections
+import concurrent.futures
 import contextlib
-import multiprocessing.dummy
+import fnmatch
+import glob
+import hashlib
+import itertools
 import os
 from packaging.version import Version
+import re
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from bson import ObjectId
 
 import eta.core.utils as etau
 
@@ -22,6 +34,8 @@ import fiftyone.core.utils as fou
 import fiftyone.operators as foo
 import fiftyone.operators.types as types
 import fiftyone.types as fot
+import fiftyone.utils.data as foud
+from fiftyone import ViewField as F
 
 
 class ImportSamples(foo.Operator):
@@ -50,6 +64,16 @@ class ImportSamples(foo.Operator):
         label_types=None,
         tags=None,
         dynamic=False,
+        recursive=False,
+        include_patterns=None,
+        exclude_patterns=None,
+        incremental=False,
+        update_changed=False,
+        manifest_path=None,
+        skip_duplicates=False,
+        hash_field=None,
+        num_workers=None,
+        min_workers=None,
         delegate=False,
         delegation_target=None,
         **kwargs,
@@ -99,6 +123,34 @@ class ImportSamples(foo.Operator):
                 delegate=True,
             )
 
+            # Import all JPEG images in a directory tree
+            import_samples(
+                dataset,
+                data_path="/path/to/images",
+                recursive=True,
+                include_patterns="*.jpg",
+                exclude_patterns="thumbnails",
+                delegate=True,
+            )
+
+            # Only import files that have not been imported by a previous
+            # run, and reset the metadata of files that have changed
+            import_samples(
+                dataset,
+                data_path="/path/to/landing",
+                incremental=True,
+                update_changed=True,
+                delegate=True,
+            )
+
+            # Skip files whose contents already exist in the dataset
+            import_samples(
+                dataset,
+                data_path="/path/to/landing",
+                skip_duplicates=True,
+                delegate=True,
+            )
+
         Args:
             dataset: a :class:`fiftyone.core.dataset.Dataset`
             dataset_type (None): the :class:`fiftyone.types.Dataset` type of
@@ -116,6 +168,40 @@ class ImportSamples(foo.Operator):
                 sample when creating new samples
             dynamic (False): whether to declare dynamic attributes of embedded
                 document fields that are encountered when importing labels
+            recursive (False): whether to import media in subdirectories of
+                ``data_path``, when it is a directory
+            include_patterns (None): an optional pattern or iterable of
+                patterns, like ``"*.jpg"``, that files in ``data_path`` must
+                match to be imported, when it is a directory
+            exclude_patterns (None): an optional pattern or iterable of
+                patterns of files and subdirectories in ``data_path`` to skip,
+                when it is a directory
+            incremental (False): whether to only import files in
+                ``data_path``, when it is a directory, that have not been
+                imported into ``dataset`` by a previous incremental import.
+                Imported files are recorded in a manifest along with their
+                modification times and sizes
+            update_changed (False): whether to reset the ``metadata`` of
+                samples whose files have changed since they were imported, and
+                re-upload their media, if applicable. Only applicable when
+                ``incremental`` is True
+            manifest_path (None): an optional path to the SQLite import
+                manifest to use when ``incremental`` is True. By default, a
+                manifest in the FiftyOne config directory is used
+            skip_duplicates (False): whether to skip media files whose
+                content hash already exists in ``hash_field`` of the dataset
+                when importing media only. The hashes of new samples are
+                stored in ``hash_field``
+            hash_field (None): the field in which to store the SHA-1 content
+                hashes of imported media. By default, ``"content_hash"`` is
+                used when ``skip_duplicates`` is True
+            num_workers (None): the maximum number of threads to use to hash
+                and upload media when importing media only. The number of
+                threads is automatically tuned between ``min_workers`` and
+                this value based on the observed throughput
+            min_workers (None): the minimum number of threads to use to hash
+                and upload media when importing media only. By default, 1 is
+                used
             delegate (False): whether to delegate execution
             delegation_target (None): an optional orchestrator on which to
                 schedule the operation, if it is delegated
@@ -134,10 +220,20 @@ class ImportSamples(foo.Operator):
 
         if dataset_dir is None and data_path is not None:
             params["import_type"] = "MEDIA_ONLY"
+            params["skip_duplicates"] = skip_duplicates
+            params["hash_field"] = hash_field
+            params["num_workers"] = num_workers
+            params["min_workers"] = min_workers
             try:
                 assert fos.isdir(data_path)
                 params["style"] = "DIRECTORY"
                 params["directory"] = _to_path(data_path)
+                params["recursive"] = recursive
+                params["include_patterns"] = _to_list(include_patterns)
+                params["exclude_patterns"] = _to_list(exclude_patterns)
+                params["incremental"] = incremental
+                params["update_changed"] = update_changed
+                params["manifest_path"] = manifest_path
             except:
                 params["style"] = "GLOB_PATTERN"
                 params["glob_patt"] = _to_path(data_path)
@@ -261,8 +357,77 @@ def _import_media_only_inputs(ctx, inputs):
         directory = _parse_path(ctx, "directory")
 
         if directory:
-            n = len(_glob_files(directory=directory))
-            if n > 0:
+            inputs.bool(
+                "recursive",
+                default=False,
+                required=False,
+                label="Recursive",
+                description="Whether to also add media in subdirectories",
+                view=types.CheckboxView(),
+            )
+            inputs.list(
+                "include_patterns",
+                types.String(),
+                default=None,
+                required=False,
+                label="Include patterns",
+                description=(
+                    "Optional pattern(s), like `*.jpg`, that files must "
+                    "match to be added"
+                ),
+                view=types.AutocompleteView(multiple=True),
+            )
+            inputs.list(
+                "exclude_patterns",
+                types.String(),
+                default=None,
+                required=False,
+                label="Exclude patterns",
+                description=(
+                    "Optional pattern(s) of files and subdirectories to skip"
+                ),
+                view=types.AutocompleteView(multiple=True),
+            )
+            inputs.bool(
+                "incremental",
+                default=False,
+                required=False,
+                label="Incremental",
+                description=(
+                    "Whether to only add files that have not been added to "
+                    "this dataset by a previous incremental import"
+                ),
+                view=types.CheckboxView(),
+            )
+
+            if ctx.params.get("incremental", False):
+                inputs.bool(
+                    "update_changed",
+                    default=False,
+                    required=False,
+                    label="Update changed",
+                    description=(
+                        "Whether to reset the metadata of samples whose "
+                        "files have changed since they were added"
+                    ),
+                    view=types.CheckboxView(),
+                )
+
+            # Only a bounded number of files are counted so that large
+            # directory trees don't stall the form
+            filepaths = _walk_files(
+                directory,
+                recursive=ctx.params.get("recursive", False),
+                include_patterns=ctx.params.get("include_patterns", None),
+                exclude_patterns=ctx.params.get("exclude_patterns", None),
+            )
+            n = sum(1 for _ in itertools.islice(filepaths, _MAX_COUNT_FILES))
+            filepaths.close()
+
+            if n >= _MAX_COUNT_FILES:
+                ready = True
+                prop.view.caption = f"Found {n}+ files"
+            elif n > 0:
                 ready = True
                 prop.view.caption = f"Found {n} files"
             else:
@@ -296,6 +461,8 @@ def _import_media_only_inputs(ctx, inputs):
                 prop.error_message = "No matching files"
         else:
             prop.view.caption = None
+    elif ctx.params.get("upload_id", None):
+        ready = _chunked_upload_inputs(ctx, inputs)
     else:
         inputs.obj(
             "media_file",
@@ -319,10 +486,58 @@ def _import_media_only_inputs(ctx, inputs):
         view=types.AutocompleteView(multiple=True),
     )
 
+    if style != "UPLOAD":
+        inputs.bool(
+            "skip_duplicates",
+            default=False,
+            required=False,
+            label="Skip duplicates",
+            description=(
+                "Whether to skip files whose contents already exist in this "
+                "dataset, as determined by their content hashes"
+            ),
+            view=types.CheckboxView(),
+        )
+
+        if ctx.params.get("skip_duplicates", False):
+            inputs.str(
+                "hash_field",
+                default=_DEFAULT_HASH_FIELD,
+                required=True,
+                label="Hash field",
+                description=(
+                    "The field in which the content hashes of samples are "
+                    "stored"
+                ),
+            )
+
     ready = _upload_media_inputs(ctx, inputs)
     if not ready:
         return False
 
+    if style != "UPLOAD":
+        inputs.int(
+            "num_workers",
+            default=None,
+            required=False,
+            label="Num workers",
+            description=(
+                "An optional maximum number of threads to use to hash and "
+                "upload media. The number of threads is automatically tuned "
+                "based on the observed throughput"
+            ),
+        )
+        inputs.int(
+            "min_workers",
+            default=None,
+            required=False,
+            label="Min workers",
+            description=(
+                "An optional minimum number of threads to use to hash and "
+                "upload media"
+            ),
+        )
+
     # Don't allow delegation when uploading files
     return style != "UPLOAD"
 
@@ -667,6 +882,9 @@ def _import_labels_only_inputs(ctx, inputs):
                 prop.invalid = True
                 prop.error_message = f"Please provide a {ext} path"
                 return False
+        elif ctx.params.get("upload_id", None):
+            if not _chunked_upload_inputs(ctx, inputs):
+                return False
         else:
             inputs.obj(
                 "labels_file",
@@ -780,7 +998,6 @@ def _upload_media_bytes(ctx):
     upload_dir = _parse_path(ctx, "upload_dir")
     overwrite = ctx.params["overwrite"]
     filename = media_obj["name"]
-    content = base64.b64decode(media_obj["content"])
 
     if overwrite:
         outpath = fos.join(upload_dir, filename)
@@ -788,7 +1005,9 @@ def _upload_media_bytes(ctx):
         filename_maker = fou.UniqueFilenameMaker(output_dir=upload_dir)
         outpath = filename_maker.get_output_path(input_path=filename)
 
-    fos.write_file(content, outpath)
+    with fos.open_file(outpath, "wb") as f:
+        _write_base64(media_obj["content"], f)
+
     return outpath
 
 
@@ -796,7 +1015,9 @@ def _import_media_only(ctx):
     style = ctx.params.get("style", None)
     tags = ctx.params.get("tags", None)
 
-    if style == "UPLOAD":
+    upload_id = ctx.params.get("upload_id", None)
+
+    if style == "UPLOAD" and not upload_id:
         filepath = _upload_media_bytes(ctx)
 
         sample = fo.Sample(filepath=filepath, tags=tags)
@@ -805,48 +1026,310 @@ def _import_media_only(ctx):
         return
 
     directory = _parse_path(ctx, "directory")
-    if style != "DIRECTORY":
-        directory = None
+    if directory is not None:
+        directory = fos.normalize_path(directory)
 
-    glob_patt = _parse_path(ctx, "glob_patt")
-    if style != "GLOB_PATTERN":
-        glob_patt = None
+    incremental = ctx.params.get("incremental", False)
+    update_changed = ctx.params.get("update_changed", False)
 
-    filepaths = _glob_files(directory=directory, glob_patt=glob_patt)
-    num_total = len(filepaths)
+    if style == "DIRECTORY":
+        # Directories are walked as samples are added, so the total number of
+        # files is not known in advance
+        filepaths = _walk_files(
+            directory,
+            recursive=ctx.params.get("recursive", False),
+            include_patterns=ctx.params.get("include_patterns", None),
+            exclude_patterns=ctx.params.get("exclude_patterns", None),
+            return_fingerprints=incremental,
+        )
+        num_total = None
+    elif style == "UPLOAD":
+        # Files that were uploaded in chunks are imported from disk
+        incremental = False
+        filepaths = _get_chunked_uploads(upload_id)
+        num_total = len(filepaths)
+    else:
+        incremental = False
+        filepaths = _glob_files(glob_patt=_parse_path(ctx, "glob_patt"))
+        num_total = len(filepaths)
 
-    if num_total == 0:
-        return
+        if num_total == 0:
+            return
+
+    filename_maker = _get_upload_filename_maker(ctx)
+
+    hash_field = ctx.params.get("hash_field", None)
+    if ctx.params.get("skip_duplicates", False):
+        hash_field = hash_field or _DEFAULT_HASH_FIELD
+
+    if hash_field is not None:
+        _ensure_hash_index(ctx.dataset, hash_field)
+
+    with contextlib.ExitStack() as exit_context:
+        if style == "UPLOAD":
+            exit_context.callback(_delete_chunked_upload, upload_id)
+
+        if incremental:
+            manifest = _ImportManifest(
+                str(ctx.dataset._doc.id),
+                directory,
+                path=ctx.params.get("manifest_path", None),
+            )
+            exit_context.callback(manifest.close)
+        else:
+            manifest = None
+
+        num_added = 0
+        for batch in _iter_batches(filepaths, _IMPORT_BATCH_SIZE):
+            if manifest is not None:
+                # Each batch is diffed against the manifest via indexed
+                # lookups rather than against all of the dataset's filepaths
+                entries, changed = manifest.diff(batch)
+                if update_changed and changed:
+                    entries.extend(
+                        _update_changed_media(ctx, manifest, changed)
+                    )
+
+                batch = [filepath for filepath, _ in entries]
+                if not batch:
+                    continue
+
+            if hash_field is not None:
+                # Media is hashed before it is uploaded so that duplicates
+                # are never copied
+                hashes = yield from _hash_media(ctx, batch)
+                keep = _get_unique_indexes(ctx.dataset, hash_field, hashes)
+
+                batch = [batch[i] for i in keep]
+                hashes = [hashes[i] for i in keep]
+                if manifest is not None:
+                    # Duplicates are recorded without a sample so that they
+                    # are not hashed again by later runs
+                    kept = set(keep)
+                    skipped = [
+                        (filepath, fingerprint, None)
+                        for idx, (filepath, fingerprint) in enumerate(entries)
+                        if idx not in kept
+                    ]
+                    entries = [entries[i] for i in keep]
+
+                if not batch:
+                    if manifest is not None:
+                        manifest.add(skipped)
+
+                    continue
+            else:
+                hashes = None
+                skipped = []
+
+            inpaths = batch
+            if filename_maker is not None:
+                batch, tasks = _upload_media_tasks(filename_maker, batch)
+                for progress in _upload_media(
+                    ctx, tasks, num_uploaded=num_added, num_total=num_total
+                ):
+                    yield progress
+
+            sample_ids = yield from _add_media_samples(
+                ctx,
+                batch,
+                tags,
+                num_added,
+                num_total,
+                hash_field=hash_field,
+                hashes=hashes,
+            )
+            num_added += len(sample_ids)
+
+            if manifest is not None:
+                manifest.add(
+                    [
+                        (inpath, fingerprint, sample_id)
+                        for inpath, (_, fingerprint), sample_id in zip(
+                            inpaths, entries, sample_ids
+                        )
+                    ]
+                    + skipped
+                )
+
+
+def _add_media_samples(
+    ctx, filepaths, tags, num_added, num_total, hash_field=None, hashes=None
+):
+    # Datasets whose labels have been merged by filename maintain filenames
+    # for new samples
+    store_filename = isinstance(
+        ctx.dataset.get_field(_FILENAME_FIELD), fof.StringField
+    )
+
+    def make_sample(filepath, content_hash):
+        fields = {}
+        if hash_field is not None:
+            fields[hash_field] = content_hash
+
+        if store_filename:
+            fields[_FILENAME_FIELD] = _get_filename(filepath)
+
+        return fo.Sample(filepath=filepath, tags=tags, **fields)
 
-    filepaths, tasks = _upload_media_tasks(ctx, filepaths)
-    if tasks:
-        for progress in _upload_media(ctx, tasks):
-            yield progress
+    if hashes is None:
+        hashes = itertools.repeat(None)
 
-    make_sample = lambda f: fo.Sample(filepath=f, tags=tags)
-    samples = map(make_sample, filepaths)
+    samples = (make_sample(f, h) for f, h in zip(filepaths, hashes))
 
     # @todo can remove version check if we require `fiftyone>=1.5.0`
     if ctx.delegated or Version(foc.VERSION) < Version("1.5.0"):
-        kwargs = {}
+        sample_ids = ctx.dataset.add_samples(
+            samples, num_samples=len(filepaths)
+        )
 
-        # @todo can remove version check if we require `fiftyone>=1.6.0`
-        if Version(foc.VERSION) >= Version("1.6.0"):
-            progress = lambda pb: ctx.set_progress(progress=pb.progress)
-            kwargs["progress"] = fo.report_progress(progress, dt=10.0)
+        progress, label = _get_import_progress(
+            num_added + len(sample_ids), num_total
+        )
+        if ctx.delegated:
+            ctx.set_progress(progress=progress, label=label)
+        else:
+            yield ctx.trigger(
+                "set_progress", dict(progress=progress, label=label)
+            )
 
-        ctx.dataset.add_samples(samples, num_samples=num_total, **kwargs)
-        return
+        return sample_ids
 
-    num_added = 0
+    sample_ids = []
     for ids in ctx.dataset.add_samples(
         samples, generator=True, progress=False
     ):
-        num_added += len(ids)
-        progress = num_added / num_total
-        label = f"Loaded {num_added} of {num_total}"
+        sample_ids.extend(ids)
+        progress, label = _get_import_progress(
+            num_added + len(sample_ids), num_total
+        )
         yield ctx.trigger("set_progress", dict(progress=progress, label=label))
 
+    return sample_ids
+
+
+_DEFAULT_HASH_FIELD = "content_hash"
+_HASH_CHUNK_SIZE = 1024**2
+
+
+def _ensure_hash_index(dataset, hash_field):
+    if not dataset.has_sample_field(hash_field):
+        dataset.add_sample_field(hash_field, fof.StringField)
+
+    dataset.create_index(hash_field)
+
+
+def _hash_media(ctx, filepaths):
+    num_hashed = 0
+    num_total = len(filepaths)
+    hashes = [None] * num_total
+
+    with _AdaptiveThreadPool(*_get_worker_bounds(ctx)) as pool:
+        for idx, content_hash in pool.imap_unordered(
+            _do_hash_media, enumerate(filepaths)
+        ):
+            hashes[idx] = content_hash
+
+            num_hashed += 1
+            if not ctx.delegated and num_hashed % 10 == 0:
+                progress = num_hashed / num_total
+                label = (
+                    f"Hashed {num_hashed} of {num_total} "
+                    f"({pool.num_workers} workers)"
+                )
+                yield ctx.trigger(
+                    "set_progress", dict(progress=progress, label=label)
+                )
+
+    return hashes
+
+
+def _do_hash_media(task):
+    idx, filepath = task
+
+    # SHA-1 is consistent with the `content_hash` metadata enrichment of the
+    # @voxel51/utils plugin
+    h = hashlib.sha1()
+    with fos.open_file(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+
+    return idx, h.hexdigest()
+
+
+def _get_unique_indexes(dataset, hash_field, hashes):
+    # An indexed `$in` query against only this batch's hashes
+    existing = set(
+        dataset.match(F(hash_field).is_in(list(set(hashes)))).distinct(
+            hash_field
+        )
+    )
+
+    # Duplicates within the batch are also skipped
+    keep = []
+    for idx, content_hash in enumerate(hashes):
+        if content_hash not in existing:
+            existing.add(content_hash)
+            keep.append(idx)
+
+    return keep
+
+
+def _update_changed_media(ctx, manifest, changed):
+    sample_ids = [sample_id for _, _, sample_id in changed if sample_id]
+    view = ctx.dataset.select(sample_ids)
+    current_filepaths = dict(zip(*view.values(["id", "filepath"])))
+
+    # Uploaded media is refreshed in place
+    upload = ctx.params.get("upload", False) and _parse_path(ctx, "upload_dir")
+
+    inpaths = []
+    outpaths = []
+    updated = []
+    missing = []
+    for filepath, fingerprint, sample_id in changed:
+        current_filepath = current_filepaths.get(sample_id, None)
+        if current_filepath is None:
+            # The sample has since been deleted, or the file was skipped as a
+            # duplicate, so the file is imported again
+            missing.append((filepath, fingerprint))
+            continue
+
+        if upload and current_filepath != filepath:
+            inpaths.append(filepath)
+            outpaths.append(current_filepath)
+
+        updated.append((filepath, fingerprint, sample_id))
+
+    if inpaths:
+        fos.copy_files(inpaths, outpaths)
+
+    if updated:
+        # Metadata is cleared so that it can be recomputed for the new files
+        ctx.dataset.select(
+            [sample_id for _, _, sample_id in updated]
+        ).clear_sample_field("metadata")
+        manifest.add(updated)
+
+    return missing
+
+
+def _get_import_progress(num_added, num_total):
+    if num_total is None:
+        return None, f"Loaded {num_added}"
+
+    return num_added / num_total, f"Loaded {num_added} of {num_total}"
+
+
+def _iter_batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+
+        yield batch
+
 
 def _import_media_and_labels(ctx):
     dataset_type = ctx.params["dataset_type"]
@@ -887,17 +1370,20 @@ def _import_media_and_labels(ctx):
 def _upload_labels_bytes(ctx, tmp_dir):
     labels_obj = ctx.params["labels_file"]
     filename = labels_obj["name"]
-    content = base64.b64decode(labels_obj["content"])
 
     outpath = fos.join(tmp_dir, filename)
-    fos.write_file(content, outpath)
+    with fos.open_file(outpath, "wb") as f:
+        _write_base64(labels_obj["content"], f)
+
     return outpath
 
 
 def _import_labels_only(ctx):
     dataset_type = ctx.params["dataset_type"]
+    labels_path_type = _get_labels_path_type(dataset_type)
     dataset_type = _get_dataset_type(dataset_type)["dataset_type"]
 
+    upload_id = ctx.params.get("upload_id", None)
     labels_file = ctx.params.get("labels_file", None)
     labels_path = _parse_path(ctx, "labels_path")
     dataset_dir = _parse_path(ctx, "dataset_dir")
@@ -915,22 +1401,24 @@ def _import_labels_only(ctx):
         kwargs["progress"] = fo.report_progress(progress, dt=10.0)
 
     with contextlib.ExitStack() as exit_context:
-        if labels_file is not None:
+        if upload_id:
+            # Labels that were uploaded in chunks are imported from disk
+            exit_context.callback(_delete_chunked_upload, upload_id)
+            labels_path = _get_chunked_labels_path(upload_id, labels_path_type)
+        elif labels_file is not None:
             tmp_dir = exit_context.enter_context(fos.TempDir())
             labels_path = _upload_labels_bytes(ctx, tmp_dir)
 
         if labels_path is not None:
-            data_path = {
-                os.path.basename(p): p for p in ctx.dataset.values("filepath")
-            }
-            ctx.dataset.merge_dir(
-                data_path=data_path,
-                labels_path=labels_path,
-                dataset_type=dataset_type,
+            for update in _merge_labels_by_filename(
+                ctx,
+                dataset_type,
+                labels_path,
                 label_field=label_field,
                 dynamic=dynamic,
                 **kwargs,
-            )
+            ):
+                yield update
 
         if dataset_dir is not None:
             ctx.dataset.merge_dir(
@@ -945,20 +1433,329 @@ def _import_labels_only(ctx):
     yield
 
 
-def _upload_media_tasks(ctx, filepaths):
+_FILENAME_FIELD = "io_filename"
+_LABELS_MERGE_BATCH_SIZE = 10000
+
+# Importers that only resolve media by looking up filenames or UUIDs in the
+# data map returned by their `_load_data_map()` method. Labels in these formats
+# are merged without loading a map of every filepath in the dataset
+_FILENAME_MAP_DATASET_TYPES = (
+    fot.COCODetectionDataset,
+    fot.VOCDetectionDataset,
+    fot.KITTIDetectionDataset,
+    fot.CVATImageDataset,
+    fot.CVATVideoDataset,
+    fot.OpenLABELImageDataset,
+    fot.OpenLABELVideoDataset,
+    fot.ImageSegmentationDirectory,
+    fot.CSVDataset,
+    fot.GeoJSONDataset,
+)
+
+
+def _get_filename(filepath):
+    # Consistent with the server-side `F("filepath").rsplit("/", 1)[-1]`
+    return filepath.rsplit("/", 1)[-1]
+
+
+def _ensure_filename_index(dataset):
+    field = dataset.get_field(_FILENAME_FIELD)
+    if field is None:
+        dataset.add_sample_field(_FILENAME_FIELD, fof.StringField)
+    elif not isinstance(field, fof.StringField):
+        raise ValueError(
+            "Cannot merge labels by filename because the dataset's "
+            "'%s' field has type %s, not %s"
+            % (_FILENAME_FIELD, type(field), fof.StringField)
+        )
+
+    dataset.create_index(_FILENAME_FIELD)
+
+    # Samples that were added by other means, or whose filepaths have changed
+    # since they were added, are updated server-side
+    filename = F("filepath").rsplit("/", 1)[-1]
+    stale = dataset.match(F(_FILENAME_FIELD) != filename)
+    if len(stale.limit(1)) > 0:
+        stale.set_field(_FILENAME_FIELD, filename).save(_FILENAME_FIELD)
+
+
+class _FilenameMap(dict):
+    """A data map for the importers of ``_FILENAME_MAP_DATASET_TYPES`` that
+    maps every filename or UUID to itself, so that the samples that an
+    importer generates can be matched to existing samples in batches via the
+    dataset's ``io_filename`` index rather than via a map of every filepath in
+    the dataset.
+
+    When the importer ignores extensions, a placeholder extension is appended
+    so that the generated samples have the dataset's media type.
+    """
+
+    def __init__(self, placeholder_ext):
+        super().__init__()
+        self.placeholder_ext = placeholder_ext
+        self.ignore_exts = False
+
+    def __missing__(self, key):
+        if self.ignore_exts:
+            return key + self.placeholder_ext
+
+        return key
+
+    def __contains__(self, key):
+        return True
+
+    def get(self, key, default=None):
+        return self[key]
+
+
+def _merge_labels_by_filename(
+    ctx,
+    dataset_type,
+    labels_path,
+    label_field=None,
+    dynamic=False,
+    **kwargs,
+):
+    dataset = ctx.dataset
+
+    # The filename field and its index are only created when labels are
+    # merged by filename, and are updated for any samples that were added or
+    # moved since the last merge
+    _ensure_filename_index(dataset)
+
+    add_kwargs = {}
+    if "progress" in kwargs:
+        add_kwargs["progress"] = kwargs.pop("progress")
+
+    importer, _ = foud.build_dataset_importer(
+        dataset_type, labels_path=labels_path, name=dataset.name, **kwargs
+    )
+
+    if dataset_type not in _FILENAME_MAP_DATASET_TYPES or not callable(
+        getattr(importer, "_load_data_map", None)
+    ):
+        # The importer's data map cannot be replaced, so it must be given the
+        # full map, excluding filenames that are ambiguous
+        filenames, filepaths = dataset.values([_FILENAME_FIELD, "filepath"])
+        counts = collections.Counter(filenames)
+        data_path = {
+            n: p for n, p in zip(filenames, filepaths) if counts[n] == 1
+        }
+        dataset.merge_dir(
+            data_path=data_path,
+            labels_path=labels_path,
+            dataset_type=dataset_type,
+            label_field=label_field,
+            dynamic=dynamic,
+            **add_kwargs,
+            **kwargs,
+        )
+        return
+
+    if dataset.media_type == fom.VIDEO:
+        filename_map = _FilenameMap(".mp4")
+    else:
+        filename_map = _FilenameMap(".jpg")
+
+    def load_data_map(data_path, ignore_exts=False, recursive=False):
+        filename_map.ignore_exts = ignore_exts
+        return filename_map
+
+    importer._load_data_map = load_data_map
+
+    # Labels are staged in a temporary dataset whose samples' placeholder
+    # filepaths are resolved in batches and then merged server-side
+    tmp = fo.Dataset()
+    try:
+        tmp.add_importer(
+            importer,
+            label_field=label_field,
+            dynamic=dynamic,
+            **add_kwargs,
+        )
+
+        num_unmatched = 0
+        num_ambiguous = 0
+        num_duplicate = 0
+        for ids, filepaths in _iter_id_pages(
+            tmp, ["filepath"], _LABELS_MERGE_BATCH_SIZE
+        ):
+            matches, ambiguous = _match_filepaths(
+                dataset, filepaths, filename_map.ignore_exts
+            )
+
+            # Each sample can only receive one set of labels. Samples in
+            # previous pages have already been resolved
+            taken = set(
+                tmp.mongo(
+                    [
+                        {
+                            "$match": {
+                                "_id": {"$lt": ObjectId(ids[0])},
+                                "filepath": {"$in": list(matches.values())},
+                            }
+                        }
+                    ]
+                ).values("filepath")
+            )
+
+            delete_ids = []
+            new_filepaths = {}
+            for _id, filepath in zip(ids, filepaths):
+                match = matches.get(filepath, None)
+                if match is not None and match not in taken:
+                    taken.add(match)
+                    new_filepaths[_id] = match
+                    continue
+
+                delete_ids.append(_id)
+                if match is not None:
+                    num_duplicate += 1
+                elif filepath in ambiguous:
+                    num_ambiguous += 1
+                else:
+                    num_unmatched += 1
+
+            if delete_ids:
+                tmp.delete_samples(delete_ids)
+
+            if new_filepaths:
+                tmp.set_values("filepath", new_filepaths, key_field="id")
+
+        default_fields = set(tmp._get_default_sample_fields())
+        fields = [
+            f for f in tmp.get_field_schema().keys() if f not in default_fields
+        ]
+
+        if tmp._has_frame_fields():
+            default_frame_fields = set(tmp._get_default_frame_fields())
+            fields.extend(
+                "frames." + f
+                for f in tmp.get_frame_field_schema().keys()
+                if f not in default_frame_fields
+            )
+
+        if fields:
+            dataset.merge_samples(
+                tmp,
+                key_field="filepath",
+                insert_new=False,
+                fields=fields,
+                expand_schema=True,
+            )
+    finally:
+        tmp.delete()
+
+    if num_unmatched or num_ambiguous or num_duplicate:
+        msg = (
+            "Skipped labels for %d files that do not match any sample, %d "
+            "files whose filename matches multiple samples, and %d files "
+            "whose sample was already labeled"
+            % (num_unmatched, num_ambiguous, num_duplicate)
+        )
+        yield ctx.ops.notify(msg, variant="warning")
+
+
+def _match_filepaths(dataset, filepaths, ignore_exts):
+    matches = {}
+    ambiguous = set()
+
+    # Labels whose media is provided as an absolute path that exists in the
+    # dataset are matched directly
+    existing = set(
+        dataset.mongo([{"$match": {"filepath": {"$in": filepaths}}}]).values(
+            "filepath"
+        )
+    )
+
+    names = {}
+    for filepath in filepaths:
+        if filepath in existing:
+            matches[filepath] = filepath
+        else:
+            name = os.path.basename(filepath)
+            if ignore_exts:
+                name = os.path.splitext(name)[0]
+
+            names.setdefault(name, []).append(filepath)
+
+    if names:
+        if ignore_exts:
+            # Prefix regexes can use the index
+            patts = [
+                re.compile("^%s(\\.[^.]*)?$" % re.escape(n)) for n in names
+            ]
+        else:
+            patts = list(names.keys())
+
+        candidates = {}
+        results = dataset.mongo(
+            [{"$match": {_FILENAME_FIELD: {"$in": patts}}}]
+        ).values([_FILENAME_FIELD, "filepath"])
+        for filename, filepath in zip(*results):
+            if ignore_exts:
+                filename = os.path.splitext(filename)[0]
+
+            candidates.setdefault(filename, []).append(filepath)
+
+        for name, _filepaths in names.items():
+            candidates_for_name = candidates.get(name, [])
+            for filepath in _filepaths:
+                if len(candidates_for_name) == 1:
+                    matches[filepath] = candidates_for_name[0]
+                elif candidates_for_name:
+                    ambiguous.add(filepath)
+
+    return matches, ambiguous
+
+
+def _iter_id_pages(sample_collection, fields, page_size):
+    # Pages are defined by ID ranges rather than `skip()` so that each page
+    # is an indexed query whose cost does not grow with the page offset
+    last_id = None
+    while True:
+        pipeline = []
+        if last_id is not None:
+            pipeline.append({"$match": {"_id": {"$gt": ObjectId(last_id)}}})
+
+        pipeline.extend([{"$sort": {"_id": 1}}, {"$limit": page_size}])
+
+        page = sample_collection.mongo(pipeline).values(
+            ["id"] + fields, _allow_missing=True
+        )
+
+        ids = page[0]
+        if not ids:
+            return
+
+        yield page
+
+        if len(ids) < page_size:
+            return
+
+        last_id = ids[-1]
+
+
+def _get_upload_filename_maker(ctx):
     upload_dir = _parse_path(ctx, "upload_dir")
-    if not ctx.params.get("upload", None):
+    upload = ctx.params.get("upload", None)
+    if not upload and ctx.params.get("style", None) != "UPLOAD":
         upload_dir = None
 
     if upload_dir is None:
-        return filepaths, None
+        return None
 
     overwrite = ctx.params.get("overwrite", False)
 
-    inpaths = filepaths
-    filename_maker = fou.UniqueFilenameMaker(
+    # The same maker is used for all batches so that name clashes are
+    # avoided across batches
+    return fou.UniqueFilenameMaker(
         output_dir=upload_dir, ignore_existing=overwrite
     )
+
+
+def _upload_media_tasks(filename_maker, filepaths):
+    inpaths = filepaths
     filepaths = [filename_maker.get_output_path(inpath) for inpath in inpaths]
 
     tasks = list(zip(inpaths, filepaths))
@@ -966,29 +1763,26 @@ def _upload_media_tasks(ctx, filepaths):
     return filepaths, tasks
 
 
-def _upload_media(ctx, tasks):
+def _upload_media(ctx, tasks, num_uploaded=0, num_total=None):
     if ctx.delegated:
         inpaths, outpaths = zip(*tasks)
         fos.copy_files(inpaths, outpaths)
         return
 
-    num_uploaded = 0
-    num_total = len(tasks)
-
-    # @todo can switch to this if we require `fiftyone>=0.22.2`
-    # num_workers = fou.recommend_thread_pool_workers()
-
-    if hasattr(fou, "recommend_thread_pool_workers"):
-        num_workers = fou.recommend_thread_pool_workers()
-    else:
-        num_workers = fo.config.max_thread_pool_workers or 8
-
-    with multiprocessing.dummy.Pool(processes=num_workers) as pool:
+    # The best concurrency depends heavily on the source and destination
+    # storage, so we let it be tuned as the upload progresses
+    with _AdaptiveThreadPool(*_get_worker_bounds(ctx)) as pool:
         for _ in pool.imap_unordered(_do_upload_media, tasks):
             num_uploaded += 1
             if num_uploaded % 10 == 0:
-                progress = num_uploaded / num_total
-                label = f"Uploaded {num_uploaded} of {num_total}"
+                if num_total is not None:
+                    progress = num_uploaded / num_total
+                    label = f"Uploaded {num_uploaded} of {num_total}"
+                else:
+                    progress = None
+                    label = f"Uploaded {num_uploaded}"
+
+                label += f" ({pool.num_workers} workers)"
                 yield ctx.trigger(
                     "set_progress", dict(progress=progress, label=label)
                 )
@@ -999,6 +1793,277 @@ def _do_upload_media(task):
     fos.copy_file(inpath, outpath)
 
 
+def _get_worker_bounds(ctx):
+    num_workers = ctx.params.get("num_workers", None)
+    min_workers = ctx.params.get("min_workers", None)
+
+    # @todo can switch to this if we require `fiftyone>=0.22.2`
+    # num_workers = fou.recommend_thread_pool_workers(num_workers)
+
+    if hasattr(fou, "recommend_thread_pool_workers"):
+        num_workers = fou.recommend_thread_pool_workers(num_workers)
+    elif num_workers is None:
+        num_workers = fo.config.max_thread_pool_workers or 8
+
+    return min_workers or 1, num_workers
+
+
+class _AdaptiveThreadPool(object):
+    """A thread pool that tunes its concurrency while running via additive
+    increase/multiplicative decrease (AIMD) of its observed throughput.
+
+    Concurrency starts at ``min_workers`` and doubles after each window of
+    completed tasks until throughput first drops. Thereafter, it grows by one
+    worker per window while throughput holds and is halved whenever
+    throughput drops more than ``tolerance`` below the best throughput
+    observed since the last decrease.
+
+    Args:
+        min_workers: the minimum number of concurrent tasks
+        max_workers: the maximum number of concurrent tasks
+        tolerance (0.1): the fractional drop in throughput between windows
+            that triggers a decrease in concurrency
+    """
+
+    def __init__(self, min_workers, max_workers, tolerance=0.1):
+        min_workers = max(1, min_workers)
+        max_workers = max(min_workers, max_workers)
+
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.tolerance = tolerance
+        self.num_workers = min_workers
+
+        self._executor = None
+        self._slow_start = True
+        self._best_throughput = None
+        self._window_start = None
+        self._window_count = 0
+
+    def __enter__(self):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        )
+        return self
+
+    def __exit__(self, *args):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def imap_unordered(self, fcn, inputs):
+        """Applies the function to each input, yielding results in the order
+        that they complete.
+
+        Args:
+            fcn: a function that accepts a single input
+            inputs: an iterable of inputs
+
+        Returns:
+            a generator of results
+        """
+        inputs = iter(inputs)
+        pending = set()
+        exhausted = False
+
+        # Windows span a single call so that time spent between calls is not
+        # counted against the throughput
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        while True:
+            while not exhausted and len(pending) < self.num_workers:
+                try:
+                    args = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                pending.add(self._executor.submit(fcn, args))
+
+            if not pending:
+                return
+
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                # The tail of a call is not representative of the throughput
+                # that the current concurrency achieves
+                if not exhausted:
+                    self._record_completion()
+
+                yield future.result()
+
+    def _record_completion(self):
+        self._window_count += 1
+        if self._window_count < max(8, 2 * self.num_workers):
+            return
+
+        now = time.monotonic()
+        throughput = self._window_count / max(now - self._window_start, 1e-6)
+        self._update(throughput)
+
+        self._window_start = now
+        self._window_count = 0
+
+    def _update(self, throughput):
+        best_throughput = self._best_throughput
+
+        if (
+            best_throughput is not None
+            and throughput < (1 - self.tolerance) * best_throughput
+        ):
+            self._slow_start = False
+            self.num_workers = max(self.min_workers, self.num_workers // 2)
+
+            # Re-measure the baseline at the new concurrency
+            self._best_throughput = None
+            return
+
+        if self._slow_start:
+            self.num_workers = min(self.max_workers, 2 * self.num_workers)
+        else:
+            self.num_workers = min(self.max_workers, self.num_workers + 1)
+
+        self._best_throughput = max(throughput, best_throughput or 0)
+
+
+_CHUNKED_UPLOADS_DIR = os.path.join(
+    tempfile.gettempdir(), "fiftyone-plugins-uploads"
+)
+_CHUNKED_UPLOAD_MAX_AGE = 86400  # seconds
+_BASE64_DECODE_SIZE = 4 * 1024 * 1024  # must be a multiple of 4
+
+
+def _chunked_upload_inputs(ctx, inputs):
+    prop = inputs.str(
+        "upload_id",
+        required=True,
+        label="Upload ID",
+        description=(
+            "The ID of the files that were uploaded via the `upload_chunk` "
+            "operator"
+        ),
+        view=types.View(),
+    )
+
+    try:
+        n = len(_get_chunked_uploads(ctx.params["upload_id"]))
+    except ValueError as e:
+        prop.invalid = True
+        prop.error_message = str(e)
+        return False
+
+    prop.view.caption = f"Found {n} uploaded files"
+    return True
+
+
+def _get_chunked_upload_dir(upload_id):
+    # IDs are validated so that they can't be used to access other paths
+    try:
+        upload_id = uuid.UUID(hex=upload_id).hex
+    except (TypeError, ValueError):
+        raise ValueError("Invalid upload ID '%s'" % upload_id)
+
+    return os.path.join(_CHUNKED_UPLOADS_DIR, upload_id)
+
+
+def _get_chunked_uploads(upload_id):
+    upload_dir = _get_chunked_upload_dir(upload_id)
+
+    filepaths = []
+    if os.path.isdir(upload_dir):
+        filepaths = sorted(
+            os.path.join(upload_dir, f) for f in os.listdir(upload_dir)
+        )
+
+    if not filepaths:
+        raise ValueError("No files were uploaded with ID '%s'" % upload_id)
+
+    return filepaths
+
+
+def _write_chunk(upload_id, name, chunk, offset=0):
+    upload_dir = _get_chunked_upload_dir(upload_id)
+
+    filename = os.path.basename(name or "")
+    if filename in ("", ".", ".."):
+        raise ValueError("Invalid filename '%s'" % name)
+
+    filepath = os.path.join(upload_dir, filename)
+    etau.ensure_dir(upload_dir)
+
+    mode = "r+b" if os.path.isfile(filepath) else "wb"
+    with open(filepath, mode) as f:
+        size = f.seek(0, os.SEEK_END)
+        if offset > size:
+            raise ValueError(
+                "Expected a chunk of '%s' at offset %d, but found offset %d"
+                % (filename, size, offset)
+            )
+
+        # Chunks are written at their offset so that retries are idempotent
+        f.seek(offset)
+        f.truncate()
+        _write_base64(chunk, f)
+
+        return f.tell()
+
+
+def _get_chunked_labels_path(upload_id, labels_path_type):
+    filepaths = _get_chunked_uploads(upload_id)
+
+    # Directory-style labels are imported from the upload's directory
+    if labels_path_type == "directory":
+        return os.path.dirname(filepaths[0])
+
+    if len(filepaths) != 1:
+        raise ValueError(
+            "Expected exactly one labels file with upload ID '%s', but found "
+            "%d" % (upload_id, len(filepaths))
+        )
+
+    return filepaths[0]
+
+
+def _delete_chunked_upload(upload_id):
+    etau.delete_dir(_get_chunked_upload_dir(upload_id))
+
+
+def _delete_stale_chunked_uploads():
+    if not os.path.isdir(_CHUNKED_UPLOADS_DIR):
+        return
+
+    # Uploads that were never imported are cleaned up eventually
+    cutoff = time.time() - _CHUNKED_UPLOAD_MAX_AGE
+    with os.scandir(_CHUNKED_UPLOADS_DIR) as it:
+        for entry in it:
+            try:
+                if _get_chunked_upload_mtime(entry.path) < cutoff:
+                    etau.delete_dir(entry.path)
+            except OSError:
+                pass
+
+
+def _get_chunked_upload_mtime(upload_dir):
+    # Appending a chunk to an existing file does not modify its directory, so
+    # an upload was last active when its newest file was last written
+    mtime = os.stat(upload_dir).st_mtime
+    with os.scandir(upload_dir) as it:
+        for entry in it:
+            mtime = max(mtime, entry.stat().st_mtime)
+
+    return mtime
+
+
+def _write_base64(content, f):
+    # Content is decoded in slices so that the decoded file is never held in
+    # memory
+    for i in range(0, len(content), _BASE64_DECODE_SIZE):
+        f.write(base64.b64decode(content[i : i + _BASE64_DECODE_SIZE]))
+
+
 def _glob_files(directory=None, glob_patt=None):
     if directory is not None:
         glob_patt = f"{directory}/*"
@@ -1009,6 +2074,369 @@ def _glob_files(directory=None, glob_patt=None):
     return fos.get_glob_matches(glob_patt)
 
 
+_IMPORT_BATCH_SIZE = 10000
+_MAX_COUNT_FILES = 1000
+
+
+def _walk_files(
+    directory,
+    recursive=False,
+    include_patterns=None,
+    exclude_patterns=None,
+    return_fingerprints=False,
+    num_workers=None,
+):
+    """Generates the paths of the files in the given directory as they are
+    found.
+
+    Directories are scanned in parallel via ``os.scandir()``, so the order in
+    which subdirectories are visited is not deterministic, but files within
+    each directory are generated in sorted order. Hidden files and directories
+    are skipped, and only a bounded number of directories are scanned ahead
+    of the consumer.
+
+    Patterns are ``fnmatch`` patterns that are matched against both the path
+    of each file or subdirectory relative to ``directory`` and its basename.
+
+    Args:
+        directory: the directory to walk
+        recursive (False): whether to walk subdirectories
+        include_patterns (None): an optional list of patterns that files must
+            match
+        exclude_patterns (None): an optional list of patterns of files and
+            subdirectories to skip
+        return_fingerprints (False): whether to generate
+            ``(filepath, (mtime, size))`` tuples rather than file paths. The
+            fingerprints are read by the threads that scan each directory
+        num_workers (None): a suggested number of threads to use
+
+    Returns:
+        a generator of file paths or ``(filepath, (mtime, size))`` tuples
+    """
+    if not fos.is_local(directory):
+        filepaths = fos.list_files(
+            directory, abs_paths=True, recursive=recursive
+        )
+        for filepath in filepaths:
+            relpath = os.path.relpath(filepath, directory)
+            if _is_included(relpath, include_patterns, exclude_patterns):
+                if return_fingerprints:
+                    yield filepath, None
+                else:
+                    yield filepath
+
+        return
+
+    # @todo can switch to this if we require `fiftyone>=0.22.2`
+    # num_workers = fou.recommend_thread_pool_workers(num_workers)
+
+    if hasattr(fou, "recommend_thread_pool_workers"):
+        num_workers = fou.recommend_thread_pool_workers(num_workers)
+    elif num_workers is None:
+        num_workers = fo.config.max_thread_pool_workers or 8
+
+    dirs = [directory]
+    pending = set()
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=num_workers
+    ) as executor:
+        try:
+            while dirs or pending:
+                while dirs and len(pending) < num_workers:
+                    dirpath = dirs.pop()
+                    pending.add(
+                        executor.submit(
+                            _scan_dir,
+                            dirpath,
+                            directory,
+                            include_patterns,
+                            exclude_patterns,
+                            return_fingerprints,
+                        )
+                    )
+
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                for future in done:
+                    filepaths, subdirs = future.result()
+                    if recursive:
+                        dirs.extend(subdirs)
+
+                    yield from filepaths
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _scan_dir(
+    dirpath, root, include_patterns, exclude_patterns, return_fingerprints
+):
+    filepaths = []
+    subdirs = []
+
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+
+            relpath = os.path.relpath(entry.path, root)
+
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_included(relpath, None, exclude_patterns):
+                    continue
+
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                if not _is_included(
+                    relpath, include_patterns, exclude_patterns
+                ):
+                    continue
+
+                if return_fingerprints:
+                    filepaths.append((entry.path, _get_fingerprint(entry)))
+                else:
+                    filepaths.append(entry.path)
+
+    filepaths.sort()
+
+    # Subdirectories are popped from the end of the stack
+    subdirs.sort(reverse=True)
+
+    return filepaths, subdirs
+
+
+def _get_fingerprint(entry):
+    try:
+        stat = entry.stat()
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _is_included(relpath, include_patterns, exclude_patterns):
+    if exclude_patterns and _matches_patterns(relpath, exclude_patterns):
+        return False
+
+    if include_patterns and not _matches_patterns(relpath, include_patterns):
+        return False
+
+    return True
+
+
+def _matches_patterns(relpath, patterns):
+    basename = os.path.basename(relpath)
+    return any(
+        fnmatch.fnmatch(relpath, patt) or fnmatch.fnmatch(basename, patt)
+        for patt in patterns
+    )
+
+
+_DEFAULT_IMPORT_MANIFEST_PATH = os.path.join(
+    foc.FIFTYONE_CONFIG_DIR, "var", "import_manifest.db"
+)
+_MANIFEST_QUERY_SIZE = 500
+
+
+class _ImportManifest(object):
+    """An on-disk SQLite manifest of the files in a source directory that
+    have been imported into a dataset.
+
+    Each file is recorded with its ``(mtime, size)`` fingerprint and the ID of
+    the sample that was created for it, or None if the file was skipped as a
+    duplicate, keyed by ``(dataset_id, source_dir, filepath)``.
+
+    Args:
+        dataset_id: the ID of the dataset
+        source_dir: the source directory
+        path (None): the path to the manifest database
+    """
+
+    def __init__(self, dataset_id, source_dir, path=None):
+        if path is None:
+            path = _DEFAULT_IMPORT_MANIFEST_PATH
+
+        etau.ensure_basedir(path)
+
+        self.dataset_id = dataset_id
+        self.source_dir = fos.normalize_path(source_dir)
+
+        self._conn = sqlite3.connect(path, timeout=60)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "dataset_id TEXT NOT NULL, "
+                "source_dir TEXT NOT NULL, "
+                "filepath TEXT NOT NULL, "
+                "mtime INTEGER, "
+                "size INTEGER, "
+                "sample_id TEXT, "
+                "PRIMARY KEY (dataset_id, source_dir, filepath))"
+            )
+
+    def diff(self, entries):
+        """Diffs the given files against the manifest.
+
+        Args:
+            entries: a list of ``(filepath, (mtime, size))`` tuples
+
+        Returns:
+            a tuple of
+
+            -   a list of ``(filepath, (mtime, size))`` tuples for files that
+                are not in the manifest
+            -   a list of ``(filepath, (mtime, size), sample_id)`` tuples for
+                files whose fingerprint has changed. ``sample_id`` is None
+                for files that were skipped as duplicates
+        """
+        records = {}
+        for idx in range(0, len(entries), _MANIFEST_QUERY_SIZE):
+            filepaths = [
+                f for f, _ in entries[idx : idx + _MANIFEST_QUERY_SIZE]
+            ]
+            rows = self._conn.execute(
+                "SELECT filepath, mtime, size, sample_id FROM files "
+                "WHERE dataset_id = ? AND source_dir = ? "
+                "AND filepath IN (%s)" % ",".join("?" * len(filepaths)),
+                [self.dataset_id, self.source_dir] + filepaths,
+            )
+            for filepath, mtime, size, sample_id in rows:
+                records[filepath] = ((mtime, size), sample_id)
+
+        new = []
+        changed = []
+        for filepath, fingerprint in entries:
+            record = records.get(filepath, None)
+            if record is None:
+                new.append((filepath, fingerprint))
+                continue
+
+            _fingerprint, sample_id = record
+            if fingerprint is not None and tuple(fingerprint) != _fingerprint:
+                changed.append((filepath, fingerprint, sample_id))
+
+        return new, changed
+
+    def add(self, entries):
+        """Adds or replaces the given files in the manifest.
+
+        Args:
+            entries: a list of ``(filepath, (mtime, size), sample_id)``
+                tuples, where ``sample_id`` may be None for files that were
+                skipped
+        """
+        if not entries:
+            return
+
+        rows = [
+            (
+                self.dataset_id,
+                self.source_dir,
+                filepath,
+                *(fingerprint or (None, None)),
+                sample_id,
+            )
+            for filepath, fingerprint, sample_id in entries
+        ]
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files "
+                "(dataset_id, source_dir, filepath, mtime, size, sample_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        """Closes the manifest."""
+        self._conn.close()
+
+
+class UploadChunk(foo.Operator):
+    @property
+    def config(self):
+        return foo.OperatorConfig(
+            name="upload_chunk",
+            label="Upload chunk",
+            light_icon="/assets/icon-light.svg",
+            dark_icon="/assets/icon-dark.svg",
+            unlisted=True,
+        )
+
+    def __call__(self, name, chunk, offset=0, upload_id=None):
+        """Writes a chunk of a file to a staging directory on the server.
+
+        Large files, and many files, can be uploaded in chunks over multiple
+        requests and then imported from disk by passing the returned
+        ``upload_id`` to ``import_samples`` with the ``"UPLOAD"`` style.
+
+        Example usage::
+
+            import base64
+            import os
+
+            import fiftyone.operators as foo
+
+            upload_chunk = foo.get_operator("@voxel51/io/upload_chunk")
+
+            upload_id = None
+            for path in ["/path/to/image1.jpg", "/path/to/image2.jpg"]:
+                name = os.path.basename(path)
+                offset = 0
+                with open(path, "rb") as f:
+                    while True:
+                        chunk = f.read(8 * 1024 * 1024)
+                        if not chunk:
+                            break
+
+                        result = upload_chunk(
+                            name,
+                            base64.b64encode(chunk).decode(),
+                            offset=offset,
+                            upload_id=upload_id,
+                        ).result
+                        upload_id = result["upload_id"]
+                        offset = result["size"]
+
+        Args:
+            name: the name of the file
+            chunk: the base64-encoded chunk
+            offset (0): the byte offset of the chunk in the file. Chunks must
+                be uploaded in order, and a chunk that is retried overwrites
+                any bytes that follow it
+            upload_id (None): the ID of an existing upload to which to add the
+                chunk. By default, a new upload is created
+
+        Returns:
+            an ``ExecutionResult`` whose ``result`` contains the
+            ``upload_id``, ``name``, and current ``size`` of the file
+        """
+        params = dict(
+            name=name,
+            chunk=chunk,
+            offset=offset,
+            upload_id=upload_id,
+        )
+        return foo.execute_operator(self.uri, params=params)
+
+    def execute(self, ctx):
+        upload_id = ctx.params.get("upload_id", None)
+        name = ctx.params["name"]
+        chunk = ctx.params["chunk"]
+        offset = ctx.params.get("offset", 0)
+
+        if upload_id is None:
+            _delete_stale_chunked_uploads()
+            upload_id = uuid.uuid4().hex
+
+        size = _write_chunk(upload_id, name, chunk, offset=offset)
+
+        return dict(upload_id=upload_id, name=name, size=size)
+
+
 class MergeSamples(foo.Operator):
     @property
     def config(self):
@@ -1080,7 +2508,6 @@ def _merge_samples_inputs(ctx, inputs):
 
 
 def _get_src_dst_collections(ctx, inputs):
-    dataset_names = fo.list_datasets()
     has_view = ctx.view != ctx.dataset.view()
     has_selected = bool(ctx.selected)
 
@@ -1131,13 +2558,11 @@ def _get_src_dst_collections(ctx, inputs):
     src_type = ctx.params.get("src_type", None)
 
     if src_type == "OTHER_DATASET":
-        src_selector = types.AutocompleteView()
-        for name in dataset_names:
-            src_selector.add_choice(name, label=name)
+        src_selector, dataset_names = _get_dataset_choices(ctx, "src_dataset")
 
         inputs.enum(
             "src_dataset",
-            dataset_names,
+            src_selector.values(),
             required=True,
             label="Choose a source dataset",
             description="Choose another dataset to merge",
@@ -1180,13 +2605,11 @@ def _get_src_dst_collections(ctx, inputs):
         dst_type = "OTHER_DATASET"
 
     if dst_type == "OTHER_DATASET":
-        dst_selector = types.AutocompleteView()
-        for name in dataset_names:
-            dst_selector.add_choice(name, label=name)
+        dst_selector, dataset_names = _get_dataset_choices(ctx, "dst_dataset")
 
         inputs.enum(
             "dst_dataset",
-            dataset_names,
+            dst_selector.values(),
             required=True,
             label="Choose a destination dataset",
             description="Choose another dataset to merge into",
@@ -1200,6 +2623,43 @@ def _get_src_dst_collections(ctx, inputs):
     return True
 
 
+_DATASET_CHOICES_LIMIT = 200
+
+
+def _get_dataset_choices(ctx, param):
+    # The current value is used as a server-side search prefix, unless it is
+    # already the name of a dataset, in which case all datasets are listed.
+    # Listings are not cached because the operators that create and delete
+    # datasets live in other plugins and could not invalidate them
+    value = ctx.params.get(param, None) or None
+
+    names = _list_datasets(prefix=value)
+    if value in names:
+        names = _list_datasets()
+
+    choices = names[:_DATASET_CHOICES_LIMIT]
+
+    # The current dataset is often the default value
+    for name in (value, getattr(ctx.dataset, "name", None)):
+        if name in names and name not in choices:
+            choices.append(name)
+
+    dataset_choices = types.AutocompleteView()
+    for name in choices:
+        dataset_choices.add_choice(name, label=name)
+
+    return dataset_choices, names
+
+
+def _list_datasets(prefix=None):
+    if prefix is not None:
+        glob_patt = glob.escape(prefix) + "*"
+    else:
+        glob_patt = None
+
+    return fo.list_datasets(glob_patt=glob_patt)
+
+
 def _get_merge_collection(ctx, target, other_name):
     if target == "SELECTED_SAMPLES":
         return ctx.view.select(ctx.selected)
@@ -2893,6 +4353,7 @@ def _get_target_view(ctx, target):
 
 def register(p):
     p.register(ImportSamples)
+    p.register(UploadChunk)
     p.register(MergeSamples)
     p.register(MergeLabels)
     p.register(ExportSamples)
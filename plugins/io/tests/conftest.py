@@ -0,0 +1,12 @@
+import importlib.util
+import os
+import sys
+
+# This plugin's directory name shadows the standard library's `io` module, so
+# the plugin is loaded from its path under another name
+_PLUGIN_PATH = os.path.join(os.path.dirname(__file__), "..", "__init__.py")
+
+_spec = importlib.util.spec_from_file_location("io_plugin", _PLUGIN_PATH)
+io_plugin = importlib.util.module_from_spec(_spec)
+sys.modules["io_plugin"] = io_plugin
+_spec.loader.exec_module(io_plugin)
@@ -0,0 +1,110 @@
+import base64
+import os
+import time
+import uuid
+
+import pytest
+
+import io_plugin
+
+
+@pytest.fixture
+def uploads_dir(tmp_path, monkeypatch):
+    """Fixture that stages chunked uploads in a temporary directory."""
+    uploads_dir = str(tmp_path / "uploads")
+    monkeypatch.setattr(io_plugin, "_CHUNKED_UPLOADS_DIR", uploads_dir)
+    return uploads_dir
+
+
+def _encode(data):
+    return base64.b64encode(data).decode()
+
+
+def test_write_chunk_appends_at_offset(uploads_dir):
+    """Test that chunks written in order are concatenated."""
+    upload_id = uuid.uuid4().hex
+
+    size = io_plugin._write_chunk(upload_id, "a.bin", _encode(b"hello "))
+    assert size == 6
+
+    size = io_plugin._write_chunk(
+        upload_id, "a.bin", _encode(b"world"), offset=size
+    )
+    assert size == 11
+
+    (filepath,) = io_plugin._get_chunked_uploads(upload_id)
+    with open(filepath, "rb") as f:
+        assert f.read() == b"hello world"
+
+
+def test_write_chunk_retry_is_idempotent(uploads_dir):
+    """Test that retrying a chunk overwrites it rather than duplicating it."""
+    upload_id = uuid.uuid4().hex
+
+    io_plugin._write_chunk(upload_id, "a.bin", _encode(b"abc"))
+    io_plugin._write_chunk(upload_id, "a.bin", _encode(b"def"), offset=3)
+    size = io_plugin._write_chunk(
+        upload_id, "a.bin", _encode(b"DEF"), offset=3
+    )
+    assert size == 6
+
+    (filepath,) = io_plugin._get_chunked_uploads(upload_id)
+    with open(filepath, "rb") as f:
+        assert f.read() == b"abcDEF"
+
+
+def test_write_chunk_rejects_gaps(uploads_dir):
+    """Test that a chunk past the end of the file is rejected."""
+    upload_id = uuid.uuid4().hex
+
+    io_plugin._write_chunk(upload_id, "a.bin", _encode(b"abc"))
+    with pytest.raises(ValueError):
+        io_plugin._write_chunk(upload_id, "a.bin", _encode(b"x"), offset=10)
+
+
+def test_write_chunk_rejects_invalid_paths(uploads_dir):
+    """Test that upload IDs and names cannot escape the uploads directory."""
+    with pytest.raises(ValueError):
+        io_plugin._write_chunk("../etc", "a.bin", _encode(b"abc"))
+
+    with pytest.raises(ValueError):
+        io_plugin._write_chunk(uuid.uuid4().hex, "..", _encode(b"abc"))
+
+
+def test_chunked_labels_path(uploads_dir):
+    """Test that labels files require exactly one uploaded file."""
+    upload_id = uuid.uuid4().hex
+    io_plugin._write_chunk(upload_id, "labels.json", _encode(b"{}"))
+
+    labels_path = io_plugin._get_chunked_labels_path(upload_id, "file")
+    assert os.path.basename(labels_path) == "labels.json"
+
+    io_plugin._write_chunk(upload_id, "other.json", _encode(b"{}"))
+    with pytest.raises(ValueError):
+        io_plugin._get_chunked_labels_path(upload_id, "file")
+
+    labels_dir = io_plugin._get_chunked_labels_path(upload_id, "directory")
+    assert labels_dir == io_plugin._get_chunked_upload_dir(upload_id)
+
+
+def test_delete_stale_uploads_uses_newest_file(uploads_dir):
+    """Test that uploads with recently written files are not deleted."""
+    stale_id = uuid.uuid4().hex
+    active_id = uuid.uuid4().hex
+    io_plugin._write_chunk(stale_id, "a.bin", _encode(b"abc"))
+    io_plugin._write_chunk(active_id, "a.bin", _encode(b"abc"))
+
+    old = time.time() - 2 * io_plugin._CHUNKED_UPLOAD_MAX_AGE
+    for upload_id in (stale_id, active_id):
+        upload_dir = io_plugin._get_chunked_upload_dir(upload_id)
+        os.utime(os.path.join(upload_dir, "a.bin"), (old, old))
+        os.utime(upload_dir, (old, old))
+
+    # Appending to an existing file doesn't update its directory's mtime
+    io_plugin._write_chunk(active_id, "a.bin", _encode(b"def"), offset=3)
+    os.utime(io_plugin._get_chunked_upload_dir(active_id), (old, old))
+
+    io_plugin._delete_stale_chunked_uploads()
+
+    assert not os.path.exists(io_plugin._get_chunked_upload_dir(stale_id))
+    assert os.path.exists(io_plugin._get_chunked_upload_dir(active_id))
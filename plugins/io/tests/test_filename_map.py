@@ -0,0 +1,37 @@
+from io_plugin import _FilenameMap, _get_filename
+
+
+def test_maps_filenames_to_themselves():
+    """Test that every filename or UUID maps to itself."""
+    filename_map = _FilenameMap(".jpg")
+
+    assert "0001.jpg" in filename_map
+    assert filename_map["0001.jpg"] == "0001.jpg"
+    assert filename_map.get("/abs/path/0001.jpg") == "/abs/path/0001.jpg"
+
+
+def test_appends_placeholder_ext_when_ignoring_exts():
+    """Test that a placeholder extension is appended to UUIDs when the
+    importer ignores extensions."""
+    filename_map = _FilenameMap(".mp4")
+    filename_map.ignore_exts = True
+
+    assert filename_map["0001"] == "0001.mp4"
+    assert filename_map.get("0001") == "0001.mp4"
+
+
+def test_never_stores_lookups():
+    """Test that lookups don't grow the map."""
+    filename_map = _FilenameMap(".jpg")
+
+    for idx in range(100):
+        filename_map["%04d.jpg" % idx]
+
+    assert len(filename_map) == 0
+
+
+def test_get_filename():
+    """Test that filenames are the last component of their filepaths."""
+    assert _get_filename("/data/images/0001.jpg") == "0001.jpg"
+    assert _get_filename("s3://bucket/0001.jpg") == "0001.jpg"
+    assert _get_filename("0001.jpg") == "0001.jpg"
@@ -0,0 +1,91 @@
+import pytest
+
+from io_plugin import _ImportManifest
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """Fixture to create a manifest in a temporary database."""
+    manifest = _ImportManifest(
+        "dataset1", "/data", path=str(tmp_path / "manifest.db")
+    )
+    yield manifest
+    manifest.close()
+
+
+def test_diff_empty_manifest(manifest):
+    """Test that every file is new when nothing has been imported."""
+    entries = [("/data/a.jpg", (1, 10)), ("/data/b.jpg", (2, 20))]
+
+    new, changed = manifest.diff(entries)
+
+    assert new == entries
+    assert changed == []
+
+
+def test_diff_unchanged_and_changed(manifest):
+    """Test that imported files are only returned when they have changed."""
+    manifest.add(
+        [("/data/a.jpg", (1, 10), "id_a"), ("/data/b.jpg", (2, 20), "id_b")]
+    )
+
+    new, changed = manifest.diff(
+        [
+            ("/data/a.jpg", (1, 10)),
+            ("/data/b.jpg", (3, 20)),
+            ("/data/c.jpg", (4, 40)),
+        ]
+    )
+
+    assert new == [("/data/c.jpg", (4, 40))]
+    assert changed == [("/data/b.jpg", (3, 20), "id_b")]
+
+
+def test_add_replaces_entries(manifest):
+    """Test that re-adding a file replaces its fingerprint."""
+    manifest.add([("/data/a.jpg", (1, 10), "id_a")])
+    manifest.add([("/data/a.jpg", (2, 10), "id_a")])
+
+    new, changed = manifest.diff([("/data/a.jpg", (2, 10))])
+
+    assert new == []
+    assert changed == []
+
+
+def test_skipped_duplicates_are_recorded(manifest):
+    """Test that files skipped without a sample are not returned as new."""
+    manifest.add([("/data/dup.jpg", (1, 10), None)])
+
+    new, changed = manifest.diff([("/data/dup.jpg", (1, 10))])
+    assert new == []
+    assert changed == []
+
+    new, changed = manifest.diff([("/data/dup.jpg", (2, 10))])
+    assert new == []
+    assert changed == [("/data/dup.jpg", (2, 10), None)]
+
+
+def test_manifests_are_scoped(tmp_path):
+    """Test that entries are scoped to their dataset and source directory."""
+    path = str(tmp_path / "manifest.db")
+
+    manifest1 = _ImportManifest("dataset1", "/data", path=path)
+    manifest1.add([("/data/a.jpg", (1, 10), "id_a")])
+    manifest1.close()
+
+    manifest2 = _ImportManifest("dataset2", "/data", path=path)
+    new, _ = manifest2.diff([("/data/a.jpg", (1, 10))])
+    manifest2.close()
+
+    assert new == [("/data/a.jpg", (1, 10))]
+
+
+def test_diff_many_files(manifest):
+    """Test diffs of more files than fit in a single query."""
+    entries = [("/data/%d.jpg" % i, (i, i)) for i in range(2500)]
+    manifest.add([(f, fp, "id%d" % i) for i, (f, fp) in enumerate(entries)])
+
+    new, changed = manifest.diff(entries + [("/data/new.jpg", (0, 0))])
+
+    assert new == [("/data/new.jpg", (0, 0))]
+    assert changed == []
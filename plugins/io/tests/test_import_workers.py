@@ -0,0 +1,57 @@
+from unittest.mock import MagicMock
+
+import io_plugin
+from io_plugin import _AdaptiveThreadPool
+
+
+def test_slow_start_doubles_workers():
+    """Test that concurrency doubles while throughput keeps improving."""
+    pool = _AdaptiveThreadPool(1, 16)
+
+    for throughput, num_workers in [(10, 2), (20, 4), (40, 8), (80, 16)]:
+        pool._update(throughput)
+        assert pool.num_workers == num_workers
+
+
+def test_drop_halves_workers():
+    """Test that a throughput drop halves concurrency, after which it grows
+    additively."""
+    pool = _AdaptiveThreadPool(1, 64)
+
+    pool._update(10)
+    pool._update(20)
+    pool._update(40)
+    pool._update(30)
+    assert pool.num_workers == 4
+
+    pool._update(30)
+    assert pool.num_workers == 5
+
+
+def test_workers_clamped_to_bounds():
+    """Test that concurrency never leaves ``[min_workers, max_workers]``."""
+    pool = _AdaptiveThreadPool(2, 5)
+
+    pool._update(10)
+    pool._update(20)
+    assert pool.num_workers == 5
+
+    pool._update(1)
+    assert pool.num_workers == 2
+
+
+def test_get_worker_bounds(monkeypatch):
+    """Test that the user's bounds are passed to the pool."""
+    monkeypatch.setattr(
+        io_plugin.fou,
+        "recommend_thread_pool_workers",
+        lambda num_workers=None: num_workers or 8,
+        raising=False,
+    )
+
+    ctx = MagicMock()
+    ctx.params = {"num_workers": 16, "min_workers": 4}
+    assert io_plugin._get_worker_bounds(ctx) == (4, 16)
+
+    ctx.params = {}
+    assert io_plugin._get_worker_bounds(ctx) == (1, 8)
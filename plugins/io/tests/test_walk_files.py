@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from io_plugin import _walk_files
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    """Fixture to create a directory tree of media files."""
+    for relpath in [
+        "a.jpg",
+        "b.png",
+        "notes.txt",
+        ".hidden.jpg",
+        "sub/c.jpg",
+        "sub/d.png",
+        "sub/deeper/e.jpg",
+        "thumbnails/f.jpg",
+        ".cache/g.jpg",
+    ]:
+        path = tmp_path / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * len(relpath))
+
+    return str(tmp_path)
+
+
+def _walk(media_dir, **kwargs):
+    return sorted(
+        os.path.relpath(f, media_dir)
+        for f in _walk_files(media_dir, num_workers=2, **kwargs)
+    )
+
+
+def test_walk_top_level(media_dir):
+    """Test that only top-level, non-hidden files are walked by default."""
+    assert _walk(media_dir) == ["a.jpg", "b.png", "notes.txt"]
+
+
+def test_walk_recursive(media_dir):
+    """Test that subdirectories are walked, except hidden ones."""
+    assert _walk(media_dir, recursive=True) == [
+        "a.jpg",
+        "b.png",
+        "notes.txt",
+        os.path.join("sub", "c.jpg"),
+        os.path.join("sub", "d.png"),
+        os.path.join("sub", "deeper", "e.jpg"),
+        os.path.join("thumbnails", "f.jpg"),
+    ]
+
+
+def test_include_patterns(media_dir):
+    """Test that include patterns match basenames and relative paths."""
+    assert _walk(media_dir, recursive=True, include_patterns=["*.png"]) == [
+        "b.png",
+        os.path.join("sub", "d.png"),
+    ]
+
+    assert _walk(
+        media_dir, recursive=True, include_patterns=["sub/*.jpg"]
+    ) == [
+        os.path.join("sub", "c.jpg"),
+        os.path.join("sub", "deeper", "e.jpg"),
+    ]
+
+
+def test_exclude_patterns(media_dir):
+    """Test that exclude patterns skip files and whole subdirectories."""
+    assert _walk(
+        media_dir,
+        recursive=True,
+        include_patterns=["*.jpg"],
+        exclude_patterns=["thumbnails", "deeper"],
+    ) == ["a.jpg", os.path.join("sub", "c.jpg")]
+
+
+def test_return_fingerprints(media_dir):
+    """Test that files are generated with their modification times and
+    sizes."""
+    results = dict(
+        _walk_files(media_dir, return_fingerprints=True, num_workers=2)
+    )
+
+    filepath = os.path.join(media_dir, "a.jpg")
+    stat = os.stat(filepath)
+    assert results[filepath] == (stat.st_mtime_ns, stat.st_size)
@@ -5,22 +5,50 @@ Utility operators.
 | `voxel51.com <https://voxel51.com/>`_
 |
 """
+import concurrent.futures
 import contextlib
+import cProfile
+from datetime import datetime
+import glob
+import hashlib
+import io
+import itertools
 import json
+import math
 import multiprocessing.dummy
+import os
 from packaging.version import Version
-
-from bson import json_util
-
+import pstats
+import queue
+import re
+import sqlite3
+import struct
+import subprocess
+import threading
+import time
+import traceback
+import tracemalloc
+
+from bson import json_util, ObjectId
+import numpy as np
+from PIL import Image, ImageOps
+import requests
+
+import eta.core.image as etai
 import eta.core.utils as etau
+import eta.core.video as etav
 
 import fiftyone as fo
+from fiftyone import ViewField as F
 import fiftyone.constants as foc
+import fiftyone.core.dataset as fod
 import fiftyone.core.fields as fof
 import fiftyone.core.media as fom
 import fiftyone.core.metadata as fomm
 import fiftyone.core.utils as fou
 import fiftyone.operators as foo
+import fiftyone.operators.delegated as food
+import fiftyone.operators.executor as fooe
 import fiftyone.operators.types as types
 import fiftyone.utils.image as foui
 
@@ -96,6 +124,8 @@ class CreateDataset(foo.Operator):
         if tags:
             dataset.tags = tags
 
+        _dataset_catalog.invalidate()
+
         ctx.trigger("open_dataset", dict(dataset=dataset.name))
 
 
@@ -129,13 +159,7 @@ class LoadDataset(foo.Operator):
         )
         sort_by = ctx.params.get("sort_by", default).lower()
 
-        info = fo.list_datasets(info=True)
-        key = lambda i: (i[sort_by] is not None, i[sort_by])
-        reverse = sort_by != "name"
-
-        dataset_choices = types.AutocompleteView()
-        for i in sorted(info, key=key, reverse=reverse):
-            dataset_choices.add_choice(i["name"], label=i["name"])
+        dataset_choices, _ = _get_dataset_choices(ctx, "name", sort_by=sort_by)
 
         inputs.enum(
             "name",
@@ -153,6 +177,130 @@ class LoadDataset(foo.Operator):
         ctx.trigger("open_dataset", dict(dataset=name))
 
 
+_DATASET_CATALOG_TTL = 10.0
+_DATASET_CHOICES_LIMIT = 200
+
+
+class _DatasetCatalog(object):
+    """A cache of dataset listings for populating dataset pickers.
+
+    Listings are cached per name prefix for ``ttl`` seconds, and prefix
+    searches are performed server-side unless a fresh listing of all
+    datasets is already cached. Operators in this plugin that create,
+    delete, or rename datasets call :meth:`invalidate`. Operators in other
+    plugins cannot, so other plugins do not cache listings.
+
+    Args:
+        ttl: the number of seconds for which listings are cached
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def list_datasets(self, prefix=None, sort_by="name", limit=None):
+        """Lists the datasets whose names start with the given prefix.
+
+        Args:
+            prefix (None): an optional name prefix
+            sort_by ("name"): the field to sort by. Supported values are
+                ``("name", "created_at", "last_loaded_at")``. Dates are sorted
+                in descending order
+            limit (None): an optional maximum number of names to return
+
+        Returns:
+            a list of dataset names
+        """
+        prefix = prefix or None
+        info = sort_by != "name"
+
+        datasets = self._get(None, info)
+        if datasets is not None:
+            if prefix is not None:
+                datasets = [
+                    d for d in datasets if _get_name(d).startswith(prefix)
+                ]
+        else:
+            datasets = self._get(prefix, info)
+            if datasets is None:
+                datasets = self._list(prefix, info)
+
+        if info:
+            key = lambda i: (i[sort_by] is not None, i[sort_by])
+            datasets = sorted(datasets, key=key, reverse=True)
+
+        names = [_get_name(d) for d in datasets]
+
+        if limit is not None:
+            names = names[:limit]
+
+        return names
+
+    def invalidate(self):
+        """Clears all cached listings."""
+        with self._lock:
+            self._cache.clear()
+
+    def _get(self, prefix, info):
+        with self._lock:
+            entry = self._cache.get((prefix, info), None)
+
+        if entry is None or entry[0] < time.monotonic():
+            return None
+
+        return entry[1]
+
+    def _list(self, prefix, info):
+        if prefix is not None:
+            glob_patt = glob.escape(prefix) + "*"
+        else:
+            glob_patt = None
+
+        datasets = fo.list_datasets(glob_patt=glob_patt, info=info)
+
+        now = time.monotonic()
+        with self._lock:
+            # Evict expired listings so that searches don't accumulate
+            for key, (expires, _) in list(self._cache.items()):
+                if expires < now:
+                    del self._cache[key]
+
+            self._cache[(prefix, info)] = (now + self.ttl, datasets)
+
+        return datasets
+
+
+def _get_name(dataset):
+    return dataset["name"] if isinstance(dataset, dict) else dataset
+
+
+_dataset_catalog = _DatasetCatalog(_DATASET_CATALOG_TTL)
+
+
+def _get_dataset_choices(ctx, param, sort_by="name"):
+    # The current value is used as a search prefix, unless it is already the
+    # name of a dataset, in which case all datasets are listed
+    value = ctx.params.get(param, None) or None
+
+    names = _dataset_catalog.list_datasets(prefix=value, sort_by=sort_by)
+    if value in names:
+        names = _dataset_catalog.list_datasets(sort_by=sort_by)
+
+    choices = names[:_DATASET_CHOICES_LIMIT]
+
+    # The current dataset is often the default value
+    for name in (value, getattr(ctx.dataset, "name", None)):
+        if name in names and name not in choices:
+            choices.append(name)
+
+    dataset_choices = types.AutocompleteView()
+    for name in choices:
+        dataset_choices.add_choice(name, label=name)
+
+    return dataset_choices, names
+
+
 class EditDatasetInfo(foo.Operator):
     @property
     def config(self):
@@ -178,6 +326,7 @@ class EditDatasetInfo(foo.Operator):
             name = ctx.params["name"]
             if name != ctx.dataset.name:
                 ctx.dataset.name = name
+                _dataset_catalog.invalidate()
 
         if "description" in ctx.params:
             description = ctx.params["description"] or None
@@ -1095,9 +1244,7 @@ class RenameDataset(foo.Operator):
     def resolve_input(self, ctx):
         inputs = types.Object()
 
-        dataset_choices = types.AutocompleteView()
-        for name in sorted(fo.list_datasets()):
-            dataset_choices.add_choice(name, label=name)
+        dataset_choices, _ = _get_dataset_choices(ctx, "name")
 
         inputs.str(
             "name",
@@ -1134,6 +1281,8 @@ class RenameDataset(foo.Operator):
             dataset = fo.load_dataset(name)
             dataset.name = new_name
 
+        _dataset_catalog.invalidate()
+
 
 class CloneDataset(foo.Operator):
     @property
@@ -1147,6 +1296,7 @@ class CloneDataset(foo.Operator):
             allow_delegated_execution=True,
             default_choice_to_delegated=False,
             dynamic=True,
+            execute_as_generator=True,
         )
 
     def resolve_input(self, ctx):
@@ -1161,32 +1311,230 @@ class CloneDataset(foo.Operator):
         new_name = ctx.params["new_name"]
         persistent = ctx.params.get("persistent", True)
         target = ctx.params.get("target", None)
+        fields = ctx.params.get("fields", None) or None
+        num_workers = ctx.params.get("num_workers", None)
 
-        if name == getattr(ctx.dataset, "name", None):
-            sample_collection = _get_target_view(ctx, target)
+        sample_collection = _get_clone_source(ctx, name, target)
+
+        if fields:
+            sample_collection = sample_collection.select_fields(fields)
+
+        if not _can_clone_chunked(sample_collection):
+            sample_collection.clone(new_name, persistent=persistent)
         else:
-            dataset = fo.load_dataset(name)
-            if target == "DATASET_VIEW":
-                sample_collection = dataset.view()
-            else:
-                sample_collection = dataset
+            for update in _clone_chunked(
+                ctx,
+                sample_collection,
+                new_name,
+                persistent=persistent,
+                num_workers=num_workers,
+            ):
+                yield update
 
-        sample_collection.clone(new_name, persistent=persistent)
+        _dataset_catalog.invalidate()
 
         if not ctx.delegated:
-            ctx.trigger("open_dataset", dict(dataset=new_name))
+            yield ctx.trigger("open_dataset", dict(dataset=new_name))
 
 
-def _get_clone_dataset_inputs(ctx, inputs):
-    datasets = sorted(fo.list_datasets())
+def _get_clone_source(ctx, name, target):
+    if name == getattr(ctx.dataset, "name", None):
+        return _get_target_view(ctx, target)
 
-    dataset_choices = types.AutocompleteView()
-    for name in datasets:
-        dataset_choices.add_choice(name, label=name)
+    dataset = fo.load_dataset(name)
+    if target == "DATASET_VIEW":
+        return dataset.view()
+
+    return dataset
+
+
+def _can_clone_chunked(sample_collection):
+    # Grouped collections and generated views (patches, frames, clips) store
+    # their samples in ways that require the full clone logic
+    if sample_collection.media_type == fom.GROUP:
+        return False
+
+    if sample_collection._is_dynamic_groups:
+        return False
+
+    return not sample_collection._is_generated
+
+
+def _clone_chunked(
+    ctx,
+    sample_collection,
+    new_name,
+    persistent=False,
+    num_workers=None,
+    chunk_size=None,
+):
+    if chunk_size is None:
+        chunk_size = _DEFAULT_CLONE_CHUNK_SIZE
+
+    if hasattr(fou, "recommend_thread_pool_workers"):
+        # @todo can remove this if we require `fiftyone>=0.22.2`
+        num_workers = fou.recommend_thread_pool_workers(num_workers)
+    elif num_workers is None:
+        num_workers = fo.config.max_thread_pool_workers or 8
+
+    # Full datasets are cloned via their unfiltered views, and then their
+    # saved views, workspaces, and runs are cloned separately
+    if isinstance(sample_collection, fo.Dataset):
+        src_dataset = sample_collection
+        sample_collection = sample_collection.view()
+    else:
+        src_dataset = None
+
+    kwargs = {}
+
+    # @todo can remove version check if we require `fiftyone>=1.6.0`
+    if src_dataset is not None and Version(foc.VERSION) >= Version("1.6.0"):
+        kwargs["include_indexes"] = True
+
+    # Cloning an empty view creates the new dataset with the source's schema,
+    # indexes, and app config, and then its samples and frames are copied in
+    # disjoint ID ranges by server-side aggregations
+    dataset = sample_collection.limit(0).clone(
+        new_name, persistent=persistent, **kwargs
+    )
+
+    try:
+        ranges = _get_id_ranges(sample_collection, chunk_size)
+        num_total = sum(n for _, n in ranges)
+        num_cloned = 0
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=num_workers
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _clone_chunk, sample_collection, dataset, id_range
+                ): n
+                for id_range, n in ranges
+            }
+
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    for f in futures:
+                        f.cancel()
+
+                    raise
+
+                num_cloned += futures[future]
+
+                progress = num_cloned / num_total
+                label = f"Cloned {num_cloned} of {num_total} samples"
+                if ctx.delegated:
+                    ctx.set_progress(progress=progress, label=label)
+                else:
+                    yield ctx.trigger(
+                        "set_progress", dict(progress=progress, label=label)
+                    )
+
+        if src_dataset is not None:
+            _clone_extras(src_dataset, dataset)
+    except Exception:
+        # Don't leave a partial clone behind
+        dataset.delete()
+        raise
+
+
+def _clone_extras(src_dataset, dataset):
+    # Saved views, workspaces, and runs are only cloned by `Dataset.clone()`,
+    # so its helper is used directly
+    # @todo can remove version check if we require `fiftyone>=1.0.0`
+    if Version(foc.VERSION) >= Version("1.0.0"):
+        fod._clone_extras(src_dataset, dataset, datetime.utcnow())
+    else:
+        fod._clone_extras(src_dataset, dataset)
+
+
+def _clone_chunk(sample_collection, dataset, id_range):
+    src_dataset = sample_collection._dataset
+    first_id, next_id = id_range
+
+    match = {"$gte": ObjectId(first_id)}
+    if next_id is not None:
+        match["$lt"] = ObjectId(next_id)
+
+    now = datetime.utcnow()
+    add_fields = {"_dataset_id": dataset._doc.id}
+    if "created_at" in dataset.get_field_schema():
+        add_fields["created_at"] = now
+        add_fields["last_modified_at"] = now
+
+    # The range is matched after the view's stages, which is required for
+    # stages like `limit()`, and MongoDB moves it ahead when it can
+    pipeline = sample_collection._pipeline(detach_frames=True)
+    pipeline.extend(
+        [
+            {"$match": {"_id": match}},
+            {"$addFields": add_fields},
+            {"$merge": {"into": dataset._sample_collection_name}},
+        ]
+    )
+    src_dataset._sample_collection.aggregate(pipeline, allowDiskUse=True)
+
+    if not dataset._has_frame_fields():
+        return
+
+    if not sample_collection._stages:
+        coll = src_dataset._frame_collection
+        pipeline = []
+    else:
+        # The view may modify the frames, so they are routed through the
+        # sample collection
+        coll = src_dataset._sample_collection
+        pipeline = sample_collection._pipeline(frames_only=True)
+
+    pipeline.extend(
+        [
+            {"$match": {"_sample_id": match}},
+            {"$addFields": add_fields},
+            {"$merge": {"into": dataset._frame_collection_name}},
+        ]
+    )
+    coll.aggregate(pipeline, allowDiskUse=True)
+
+
+def _get_id_ranges(sample_collection, chunk_size):
+    first_ids = sample_collection.mongo(
+        [{"$sort": {"_id": 1}}, {"$limit": 1}]
+    ).values("id")
+    if not first_ids:
+        return []
+
+    # Each range starts `chunk_size` IDs after the start of the previous one,
+    # so the total cost is a single pass over the `_id` index. The last range
+    # is unbounded
+    ranges = []
+    first_id = first_ids[0]
+    while True:
+        view = sample_collection.mongo(
+            [
+                {"$match": {"_id": {"$gte": ObjectId(first_id)}}},
+                {"$sort": {"_id": 1}},
+            ]
+        )
+        next_ids = view.skip(chunk_size).limit(1).values("id")
+        if not next_ids:
+            ranges.append(((first_id, None), len(view)))
+            break
+
+        ranges.append(((first_id, next_ids[0]), chunk_size))
+        first_id = next_ids[0]
+
+    return ranges
+
+
+def _get_clone_dataset_inputs(ctx, inputs):
+    dataset_choices, datasets = _get_dataset_choices(ctx, "name")
 
     name_prop = inputs.enum(
         "name",
-        datasets,
+        dataset_choices.values(),
         default=getattr(ctx.dataset, "name", None),
         required=True,
         label="Dataset",
@@ -1279,7 +1627,7 @@ def _get_clone_dataset_inputs(ctx, inputs):
     if new_name is None:
         return
 
-    if new_name in datasets:
+    if fo.dataset_exists(new_name):
         new_name_prop.invalid = True
         new_name_prop.error_message = f"Dataset {new_name} already exists"
 
@@ -1291,6 +1639,45 @@ def _get_clone_dataset_inputs(ctx, inputs):
         description="Whether to make the dataset persistent",
     )
 
+    target = ctx.params.get("target", default_target)
+    sample_collection = _get_clone_source(ctx, name, target)
+
+    field_choices = types.DropdownView(multiple=True)
+    for path in sample_collection.get_field_schema().keys():
+        field_choices.add_choice(path, label=path)
+
+    if sample_collection._has_frame_fields():
+        for path in sample_collection.get_frame_field_schema().keys():
+            path = "frames." + path
+            field_choices.add_choice(path, label=path)
+
+    inputs.list(
+        "fields",
+        types.String(),
+        default=None,
+        required=False,
+        label="Fields",
+        description=(
+            "An optional subset of fields to clone. Default fields are always "
+            "included. Cloning a subset of an entire dataset's fields "
+            "excludes its views, workspaces, and runs"
+        ),
+        view=field_choices,
+    )
+
+    inputs.int(
+        "num_workers",
+        default=None,
+        required=False,
+        label="Num workers",
+        description=(
+            "An optional number of chunks of samples to copy in parallel"
+        ),
+    )
+
+
+_DEFAULT_CLONE_CHUNK_SIZE = 10000
+
 
 class DeleteDataset(foo.Operator):
     @property
@@ -1306,9 +1693,7 @@ class DeleteDataset(foo.Operator):
     def resolve_input(self, ctx):
         inputs = types.Object()
 
-        dataset_choices = types.AutocompleteView()
-        for name in sorted(fo.list_datasets()):
-            dataset_choices.add_choice(name, label=name)
+        dataset_choices, _ = _get_dataset_choices(ctx, "name")
 
         inputs.str(
             "name",
@@ -1329,6 +1714,8 @@ class DeleteDataset(foo.Operator):
 
         fo.delete_dataset(name)
 
+        _dataset_catalog.invalidate()
+
 
 class DeleteSamples(foo.Operator):
     @property
@@ -1338,7 +1725,11 @@ class DeleteSamples(foo.Operator):
             label="Delete samples",
             light_icon="/assets/icon-light.svg",
             dark_icon="/assets/icon-dark.svg",
+            allow_immediate_execution=True,
+            allow_delegated_execution=True,
+            default_choice_to_delegated=False,
             dynamic=True,
+            execute_as_generator=True,
         )
 
     def resolve_input(self, ctx):
@@ -1350,14 +1741,54 @@ class DeleteSamples(foo.Operator):
 
     def execute(self, ctx):
         target = ctx.params.get("target", None)
+        chunk_size = ctx.params.get("chunk_size", None)
         view = _get_target_view(ctx, target)
 
-        if isinstance(view, fo.Dataset):
-            ctx.dataset.clear()
-        else:
-            ctx.dataset.delete_samples(view)
+        for update in _delete_samples(ctx, view, chunk_size=chunk_size):
+            yield update
 
-        ctx.trigger("reload_dataset")
+        if not ctx.delegated:
+            yield ctx.trigger("reload_dataset")
+
+
+_DEFAULT_DELETE_CHUNK_SIZE = 10000
+
+
+def _delete_samples(ctx, sample_collection, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = _DEFAULT_DELETE_CHUNK_SIZE
+
+    # Grouped datasets contain samples in every slice, which only `clear()`
+    # can delete
+    if (
+        isinstance(sample_collection, fo.Dataset)
+        and sample_collection.media_type == fom.GROUP
+    ):
+        sample_collection.clear()
+        return
+
+    dataset = sample_collection._dataset
+
+    # Grouped views only contain their active slice's samples, so only those
+    # samples are deleted
+    num_total = len(sample_collection)
+    num_deleted = 0
+
+    # Chunks are deleted in ID order, so if the operation fails, it can be
+    # resumed by running it again on the same view
+    for (ids,) in _iter_id_pages(sample_collection, [], chunk_size):
+        dataset.delete_samples(ids)
+
+        num_deleted += len(ids)
+
+        progress = num_deleted / num_total
+        label = f"Deleted {num_deleted} of {num_total} samples"
+        if ctx.delegated:
+            ctx.set_progress(progress=progress, label=label)
+        else:
+            yield ctx.trigger(
+                "set_progress", dict(progress=progress, label=label)
+            )
 
 
 def _delete_samples_inputs(ctx, inputs):
@@ -1413,6 +1844,18 @@ def _delete_samples_inputs(ctx, inputs):
             view=types.Warning(),
         )
         prop.invalid = True
+        return
+
+    inputs.int(
+        "chunk_size",
+        default=_DEFAULT_DELETE_CHUNK_SIZE,
+        required=False,
+        label="Chunk size",
+        description=(
+            "The number of samples to delete at a time. If the operation is "
+            "interrupted, you can run it again on the same samples to resume"
+        ),
+    )
 
 
 class ApplySavedView(foo.Operator):
@@ -1457,11 +1900,7 @@ class ApplySavedView(foo.Operator):
 
 
 def _apply_saved_view_inputs(ctx, inputs):
-    dataset_names = fo.list_datasets()
-
-    dataset_choices = types.AutocompleteView()
-    for name in dataset_names:
-        dataset_choices.add_choice(name, label=name)
+    dataset_choices, dataset_names = _get_dataset_choices(ctx, "src_dataset")
 
     inputs.enum(
         "src_dataset",
@@ -1504,6 +1943,9 @@ def serialize_view(view):
     return json.loads(json_util.dumps(view._serialize()))
 
 
+_DEFAULT_METADATA_BATCH_SIZE = 1000
+
+
 class ComputeMetadata(foo.Operator):
     @property
     def config(self):
@@ -1524,7 +1966,19 @@ class ComputeMetadata(foo.Operator):
         self,
         sample_collection,
         overwrite=False,
+        header_only=False,
+        use_cache=False,
+        cache_path=None,
         num_workers=None,
+        adaptive_workers=False,
+        min_workers=None,
+        num_video_workers=None,
+        video_timeout=None,
+        enrichments=None,
+        batch_size=None,
+        failures_field=None,
+        num_shards=None,
+        profile=False,
         delegate=False,
         delegation_target=None,
     ):
@@ -1545,11 +1999,91 @@ class ComputeMetadata(foo.Operator):
             # Delegate computation and overwrite existing values
             compute_metadata(dataset, overwrite=True, delegate=True)
 
+            # Only read image headers rather than full images
+            compute_metadata(dataset, overwrite=True, header_only=True)
+
+            # Reuse metadata for files that have not changed since a
+            # previous run
+            compute_metadata(dataset, overwrite=True, use_cache=True)
+
+            # Also compute perceptual hashes of each image
+            compute_metadata(
+                dataset, overwrite=True, enrichments=["phash", "dhash"]
+            )
+
+            # Split the work into 8 delegated operations that can run on
+            # separate workers
+            compute_metadata(dataset, num_shards=8, delegate=True)
+
+            # Store a profile of the delegated operation in its result
+            compute_metadata(dataset, profile=True, delegate=True)
+
         Args:
             sample_collection: a
                 :class:`fiftyone.core.collections.SampleCollection`
             overwrite (False): whether to overwrite existing metadata
-            num_workers (None): a suggested number of threads to use
+            header_only (False): whether to compute image metadata by parsing
+                only the headers of JPEG, PNG, WebP, and TIFF images. Other
+                media fall back to the full metadata computation
+            use_cache (False): whether to read and write metadata from an
+                on-disk cache keyed by filepath, modification time, and size,
+                so that unchanged files need not be read again
+            cache_path (None): an optional path to the SQLite metadata cache
+                to use. By default, a cache in the FiftyOne config directory
+                is used
+            num_workers (None): a suggested number of threads to use. When
+                ``adaptive_workers`` is True, this is the maximum number of
+                threads to use
+            adaptive_workers (False): whether to automatically tune the number
+                of threads while running based on the observed throughput
+            min_workers (None): the minimum number of threads to use when
+                ``adaptive_workers`` is True. By default, 1 is used
+            num_video_workers (None): a suggested number of processes to use
+                to compute metadata for videos when execution is delegated.
+                Videos are probed via ``ffprobe`` in batches in a process pool
+                rather than in the thread pool used for other media
+            video_timeout (None): an optional maximum number of seconds to
+                wait for ``ffprobe`` to read each video. Videos that time out
+                are recorded as failures
+            enrichments (None): an optional list of additional attributes to
+                compute for each image from the same read of the image and
+                store on its ``metadata``. Supported values are:
+
+                -   ``"phash"``: a perceptual hash, stored in
+                    ``metadata.phash``
+                -   ``"dhash"``: a difference hash, stored in
+                    ``metadata.dhash``
+                -   ``"content_hash"``: the SHA-1 hash of the file, stored in
+                    ``metadata.content_hash``
+                -   ``"brightness"``: the mean and standard deviation of the
+                    grayscale intensities, stored in
+                    ``metadata.brightness_mean`` and
+                    ``metadata.brightness_std``
+                -   ``"blurhash"``: a `BlurHash <https://blurha.sh>`_
+                    placeholder, stored in ``metadata.blurhash``
+
+                Images are fully read when enrichments are requested, even if
+                ``header_only`` is True
+            batch_size (None): the number of samples to read from the database
+                and write back at a time. By default, 1000 is used
+            failures_field (None): an optional sample field in which to
+                record the exception type and message for samples whose
+                metadata could not be computed. Samples whose metadata is
+                successfully computed have this field cleared
+            num_shards (None): an optional number of disjoint shards into
+                which to split the collection when execution is delegated.
+                Each shard is queued as its own delegated operation, and the
+                original operation reports their combined progress and
+                failures. Shards whose worker stops reporting progress for an
+                hour are marked as failed. Requires ``fiftyone>=1.5.0``;
+                otherwise the collection is processed in a single operation
+            profile (False): whether to run the operation under ``cProfile``
+                and ``tracemalloc`` when execution is delegated and store its
+                wall time, peak memory, the duration of each phase, and its
+                top hotspots by cumulative time in the operation's result.
+                Profiling is always enabled when the
+                ``FIFTYONE_PLUGINS_PROFILE`` environment variable is set on
+                the worker
             delegate (False): whether to delegate execution
             delegation_target (None): an optional orchestrator on which to
                 schedule the operation, if it is delegated
@@ -1561,7 +2095,19 @@ class ComputeMetadata(foo.Operator):
 
         params = dict(
             overwrite=overwrite,
+            header_only=header_only,
+            use_cache=use_cache,
+            cache_path=cache_path,
             num_workers=num_workers,
+            adaptive_workers=adaptive_workers,
+            min_workers=min_workers,
+            num_video_workers=num_video_workers,
+            video_timeout=video_timeout,
+            enrichments=enrichments,
+            batch_size=batch_size,
+            failures_field=failures_field,
+            num_shards=num_shards,
+            profile=profile,
         )
 
         return foo.execute_operator(
@@ -1582,10 +2128,31 @@ class ComputeMetadata(foo.Operator):
         )
 
     def execute(self, ctx):
+        # Results of operations that yield updates are discarded, so profiled
+        # runs are executed to completion here and return their profile
+        if ctx.delegated and _is_profiling(ctx):
+            _, profile = _run_profiled(lambda: _exhaust(self._execute(ctx)))
+            return dict(profile=profile)
+
+        return self._execute(ctx)
+
+    def _execute(self, ctx):
         overwrite = ctx.params.get("overwrite", False)
+        header_only = ctx.params.get("header_only", False)
+        use_cache = ctx.params.get("use_cache", False)
+        cache_path = ctx.params.get("cache_path", None)
         num_workers = ctx.params.get("num_workers", None)
+        adaptive_workers = ctx.params.get("adaptive_workers", False)
+        min_workers = ctx.params.get("min_workers", None)
+        num_video_workers = ctx.params.get("num_video_workers", None)
+        video_timeout = ctx.params.get("video_timeout", None)
+        enrichments = ctx.params.get("enrichments", None) or None
+        batch_size = ctx.params.get("batch_size", None)
+        failures_field = ctx.params.get("failures_field", None) or None
         skip_failures = ctx.params.get("skip_failures", True)
         warn_failures = ctx.params.get("warn_failures", True)
+        num_shards = ctx.params.get("num_shards", None)
+        shard = ctx.params.get("shard", None)
 
         # @todo can remove this if we require `fiftyone>=1.8.0`
         if Version(foc.VERSION) >= Version("1.8.0"):
@@ -1593,31 +2160,48 @@ class ComputeMetadata(foo.Operator):
         else:
             view = _get_target_view(ctx, ctx.params.get("target", None))
 
-        if ctx.delegated:
-            kwargs = {}
-
-            # @todo can remove version check if we require `fiftyone>=1.6.0`
-            if Version(foc.VERSION) >= Version("1.6.0"):
-                progress = lambda pb: ctx.set_progress(progress=pb.progress)
-                kwargs["progress"] = fo.report_progress(progress, dt=10.0)
-
-            view.compute_metadata(
+        if (
+            shard is None
+            and ctx.delegated
+            and num_shards is not None
+            and num_shards > 1
+            and _supports_shards()
+        ):
+            generator = _compute_metadata_shards(
+                ctx,
+                self.uri,
+                view,
+                num_shards,
                 overwrite=overwrite,
-                num_workers=num_workers,
+                failures_field=failures_field,
                 skip_failures=skip_failures,
                 warn_failures=warn_failures,
-                **kwargs,
             )
         else:
-            for update in _compute_metadata_generator(
+            if shard is not None:
+                view = _get_shard_view(view, shard)
+
+            generator = _compute_metadata_generator(
                 ctx,
                 view,
                 overwrite=overwrite,
+                header_only=header_only,
+                use_cache=use_cache,
+                cache_path=cache_path,
                 num_workers=num_workers,
+                adaptive_workers=adaptive_workers,
+                min_workers=min_workers,
+                num_video_workers=num_video_workers,
+                video_timeout=video_timeout,
+                enrichments=enrichments,
+                batch_size=batch_size,
+                failures_field=failures_field,
                 skip_failures=skip_failures,
                 warn_failures=warn_failures,
-            ):
-                yield update
+            )
+
+        for update in generator:
+            yield update
 
         if not ctx.delegated:
             yield ctx.trigger("reload_dataset")
@@ -1708,6 +2292,43 @@ def _compute_metadata_inputs(ctx, inputs):
         view=types.CheckboxView(),
     )
 
+    inputs.bool(
+        "header_only",
+        default=False,
+        label="Only read image headers?",
+        description=(
+            "Whether to compute image metadata by reading only the headers "
+            "of JPEG, PNG, WebP, and TIFF files. Other media are fully read"
+        ),
+    )
+
+    enrichment_choices = types.DropdownView(multiple=True)
+    for name, (label, _) in _METADATA_ENRICHMENTS.items():
+        enrichment_choices.add_choice(name, label=label)
+
+    inputs.list(
+        "enrichments",
+        types.String(),
+        required=False,
+        default=None,
+        label="Enrichments",
+        description=(
+            "Optional additional attribute(s) to compute for each image from "
+            "the same read of the image"
+        ),
+        view=enrichment_choices,
+    )
+
+    inputs.bool(
+        "use_cache",
+        default=False,
+        label="Use metadata cache?",
+        description=(
+            "Whether to reuse cached metadata for files whose modification "
+            "time and size have not changed since they were last processed"
+        ),
+    )
+
     inputs.bool(
         "skip_failures",
         default=True,
@@ -1727,6 +2348,17 @@ def _compute_metadata_inputs(ctx, inputs):
         ),
     )
 
+    inputs.str(
+        "failures_field",
+        default=None,
+        required=False,
+        label="Failures field",
+        description=(
+            "An optional field in which to record why metadata could not be "
+            "computed for each failed sample"
+        ),
+    )
+
     if n == 0:
         return
 
@@ -1735,113 +2367,1351 @@ def _compute_metadata_inputs(ctx, inputs):
         default=None,
         required=False,
         label="Num workers",
-        description="An optional number of threads to use",
+        description=(
+            "An optional number of threads to use, or the maximum number of "
+            "threads to use if adaptive workers are enabled"
+        ),
     )
 
-    return True
-
-
-def _compute_metadata_generator(
-    ctx,
-    sample_collection,
-    overwrite=False,
-    num_workers=None,
-    skip_failures=True,
-    warn_failures=True,
-):
-    # @todo can switch to this if we require `fiftyone>=0.22.2`
-    # num_workers = fou.recommend_thread_pool_workers(num_workers)
+    inputs.bool(
+        "adaptive_workers",
+        default=False,
+        label="Adaptive workers?",
+        description=(
+            "Whether to automatically tune the number of threads based on "
+            "the observed throughput while running"
+        ),
+    )
 
-    if hasattr(fou, "recommend_thread_pool_workers"):
-        num_workers = fou.recommend_thread_pool_workers(num_workers)
-    elif num_workers is None:
-        num_workers = fo.config.max_thread_pool_workers or 8
+    if target_view.media_type != fom.IMAGE:
+        inputs.int(
+            "num_video_workers",
+            default=None,
+            required=False,
+            label="Num video workers",
+            description=(
+                "An optional number of processes to use to read video "
+                "metadata when this operation is delegated"
+            ),
+        )
 
-    if not overwrite:
-        sample_collection = sample_collection.exists("metadata", False)
+        inputs.float(
+            "video_timeout",
+            default=None,
+            required=False,
+            label="Video timeout",
+            description=(
+                "An optional maximum number of seconds to spend reading the "
+                "metadata of each video"
+            ),
+        )
 
-    ids, filepaths, media_types = sample_collection.values(
-        ["id", "filepath", "_media_type"],
-        _allow_missing=True,
+    inputs.int(
+        "batch_size",
+        default=None,
+        required=False,
+        label="Batch size",
+        description=(
+            "An optional number of samples to read from the database and "
+            "write back at a time. The default is "
+            f"{_DEFAULT_METADATA_BATCH_SIZE}"
+        ),
     )
 
-    num_total = len(ids)
+    inputs.int(
+        "num_shards",
+        default=None,
+        required=False,
+        label="Num shards",
+        description=(
+            "An optional number of shards into which to split the samples "
+            "when this operation is delegated. Each shard is scheduled as "
+            "its own delegated operation so that multiple workers can "
+            "process them in parallel"
+        ),
+    )
+
+    inputs.bool(
+        "profile",
+        default=False,
+        required=False,
+        label="Profile",
+        description=(
+            "Whether to profile this operation when it is delegated. The "
+            "wall time, peak memory, and top hotspots of the run are stored "
+            "in the operation's result"
+        ),
+        view=types.CheckboxView(),
+    )
+
+    return True
+
+
+def _compute_metadata_generator(
+    ctx,
+    sample_collection,
+    overwrite=False,
+    header_only=False,
+    use_cache=False,
+    cache_path=None,
+    num_workers=None,
+    adaptive_workers=False,
+    min_workers=None,
+    num_video_workers=None,
+    video_timeout=None,
+    enrichments=None,
+    batch_size=None,
+    failures_field=None,
+    skip_failures=True,
+    warn_failures=True,
+    set_progress=None,
+):
+    if batch_size is None:
+        batch_size = _DEFAULT_METADATA_BATCH_SIZE
+
+    # @todo can switch to this if we require `fiftyone>=0.22.2`
+    # num_workers = fou.recommend_thread_pool_workers(num_workers)
+
+    if hasattr(fou, "recommend_thread_pool_workers"):
+        num_workers = fou.recommend_thread_pool_workers(num_workers)
+    elif num_workers is None:
+        num_workers = fo.config.max_thread_pool_workers or 8
+
+    # No multiprocessing allowed when running synchronously
+    if not ctx.delegated:
+        num_video_workers = 0
+    else:
+        num_video_workers = fou.recommend_process_pool_workers(
+            num_video_workers
+        )
+
+    if not overwrite:
+        sample_collection = sample_collection.exists("metadata", False)
+
+    num_total = len(sample_collection)
     if num_total == 0:
         return
 
-    inputs = zip(ids, filepaths, media_types)
-    values = {}
+    if use_cache:
+        cache = _MetadataCache(
+            cache_path, mode="header" if header_only else "full"
+        )
+    else:
+        cache = None
+
+    if adaptive_workers:
+        pool = _AdaptiveThreadPool(min_workers or 1, num_workers)
+    else:
+        pool = None
+
+    def get_label(num_computed):
+        label = f"Computed {num_computed} of {num_total}"
+        if pool is not None:
+            label += f" ({pool.num_workers} workers)"
+
+        return label
+
+    kwargs = {}
+
+    if set_progress is None:
+        set_progress = ctx.set_progress
+
+    # @todo can remove version check if we require `fiftyone>=1.6.0`
+    if ctx.delegated and Version(foc.VERSION) >= Version("1.6.0"):
+        progress = lambda pb: set_progress(
+            progress=pb.progress, label=get_label(pb.iteration)
+        )
+        kwargs["progress"] = fo.report_progress(progress, dt=10.0)
+
+    pages = _iter_id_pages(
+        sample_collection, ["filepath", "_media_type"], batch_size
+    )
+
+    # Results are written back after each page so that memory usage is
+    # bounded by `batch_size` and progress survives interruptions
+    values = {}
+    failures = {}
+    cache_entries = []
+
+    num_failed = 0
+    first_failure = None
+
+    try:
+        num_computed = 0
+        with contextlib.ExitStack() as exit_context:
+            pb = fou.ProgressBar(total=num_total, **kwargs)
+            exit_context.enter_context(pb)
+
+            if pool is not None:
+                exit_context.enter_context(pool)
+                imap = pool.imap_unordered
+            elif num_workers > 1:
+                _pool = multiprocessing.dummy.Pool(processes=num_workers)
+                exit_context.enter_context(_pool)
+                imap = _pool.imap_unordered
+            else:
+                imap = map
+
+            video_pool = None
+
+            for ids, filepaths, media_types in pages:
+                inputs = list(zip(ids, filepaths, media_types))
+
+                if num_video_workers > 1:
+                    video_inputs = [i for i in inputs if i[2] == fom.VIDEO]
+                    inputs = [i for i in inputs if i[2] != fom.VIDEO]
+                else:
+                    video_inputs = []
+
+                # Video tasks are submitted to the worker processes before
+                # the other media in the page are processed by the thread
+                # pool, so that both run concurrently
+                if video_inputs:
+                    if video_pool is None:
+                        mp_ctx = fou.get_multiprocessing_context()
+                        video_pool = mp_ctx.Pool(processes=num_video_workers)
+                        exit_context.enter_context(video_pool)
+
+                    video_results = _compute_video_metadata(
+                        video_pool,
+                        video_inputs,
+                        video_timeout,
+                        cache,
+                        num_video_workers,
+                    )
+                else:
+                    video_results = []
+
+                results = imap(
+                    _do_compute_metadata,
+                    (
+                        (*i, header_only, video_timeout, enrichments, cache)
+                        for i in inputs
+                    ),
+                )
+                results = itertools.chain(results, video_results)
+
+                # Results are computed lazily as they are consumed
+                with _profile_phase("compute metadata"):
+                    for result in results:
+                        (
+                            sample_id,
+                            filepath,
+                            metadata,
+                            fingerprint,
+                            failure,
+                        ) = result
+                        values[sample_id] = metadata
+
+                        if failures_field is not None:
+                            failures[sample_id] = failure
+
+                        if failure is not None:
+                            num_failed += 1
+                            if first_failure is None:
+                                first_failure = (filepath, failure)
+                        elif fingerprint is not None:
+                            cache_entries.append(
+                                (filepath, fingerprint, metadata)
+                            )
+
+                        pb.update()
+                        num_computed += 1
+                        if not ctx.delegated and num_computed % 10 == 0:
+                            progress = num_computed / num_total
+                            label = get_label(num_computed)
+                            yield ctx.trigger(
+                                "set_progress",
+                                dict(progress=progress, label=label),
+                            )
+
+                _flush_metadata(
+                    sample_collection,
+                    values,
+                    failures_field,
+                    failures,
+                    cache,
+                    cache_entries,
+                    dynamic=bool(enrichments),
+                )
+                values = {}
+                failures = {}
+                cache_entries = []
+    finally:
+        _flush_metadata(
+            sample_collection,
+            values,
+            failures_field,
+            failures,
+            cache,
+            cache_entries,
+            dynamic=bool(enrichments),
+        )
+
+        if cache is not None:
+            cache.close()
+
+    if skip_failures and not warn_failures:
+        return
+
+    if num_failed > 0:
+        msg = _get_metadata_failures_msg(
+            num_failed, failures_field, first_failure
+        )
+
+        if skip_failures:
+            yield ctx.ops.notify(msg, variant="warning")
+        else:
+            yield ctx.ops.notify(msg, variant="error")
+            raise ValueError(msg)
+
+
+def _get_metadata_failures_msg(num_failed, failures_field, first_failure):
+    if failures_field is not None:
+        retrieve = f'dataset.exists("{failures_field}")'
+    else:
+        retrieve = 'dataset.exists("metadata", False)'
+
+    msg = "Failed to populate metadata on %d samples. " % num_failed
+    msg += "Use `%s` to retrieve them" % retrieve
+
+    if first_failure is not None:
+        filepath, failure = first_failure
+        msg += ". First failure: %s: %s (%s)" % (
+            failure["type"],
+            failure["message"],
+            filepath,
+        )
+
+    return msg
+
+
+_SHARD_POLL_INTERVAL = 10.0
+_SHARD_HEARTBEAT_TIMEOUT = 3600.0
+
+# @todo can remove this if we require `fiftyone>=1.5.0`
+_SHARDS_MIN_VERSION = "1.5.0"
+
+
+def _supports_shards():
+    # Shards are queued with an explicit context and claimed via a
+    # conditional state transition, which older services do not support
+    return Version(foc.VERSION) >= Version(_SHARDS_MIN_VERSION)
+
+
+def _compute_metadata_shards(
+    ctx,
+    operator_uri,
+    sample_collection,
+    num_shards,
+    overwrite=False,
+    failures_field=None,
+    skip_failures=True,
+    warn_failures=True,
+):
+    if not overwrite:
+        sample_collection = sample_collection.exists("metadata", False)
+
+    shards = _get_shard_ranges(sample_collection, num_shards)
+    if not shards:
+        return
+
+    # Failures are summarized once all shards are complete
+    params = [
+        dict(ctx.params, shard=shard, num_shards=None, warn_failures=False)
+        for shard, _ in shards
+    ]
+
+    run_shard = lambda params, set_progress: _run_metadata_shard(
+        ctx, params, set_progress
+    )
+
+    errors = yield from _run_shards(
+        ctx, operator_uri, "Compute metadata", shards, params, run_shard
+    )
+
+    if errors:
+        idx, error = errors[0]
+        raise ValueError(
+            "Failed to compute metadata for %d of %d shards. First failure "
+            "(shard %d):\n%s" % (len(errors), len(shards), idx, error)
+        )
+
+    if skip_failures and not warn_failures:
+        return
+
+    # Reduce: summarize the failures across all shards
+    if failures_field is not None:
+        failed_view = sample_collection.exists(failures_field)
+    else:
+        failed_view = sample_collection.exists("metadata", False)
+
+    num_failed = len(failed_view)
+    if num_failed == 0:
+        return
+
+    first_failure = None
+    if failures_field is not None:
+        filepaths, failures = failed_view.limit(1).values(
+            ["filepath", failures_field]
+        )
+        first_failure = (filepaths[0], failures[0])
+
+    msg = _get_metadata_failures_msg(num_failed, failures_field, first_failure)
+
+    if skip_failures:
+        yield ctx.ops.notify(msg, variant="warning")
+    else:
+        yield ctx.ops.notify(msg, variant="error")
+        raise ValueError(msg)
+
+
+def _run_metadata_shard(ctx, params, set_progress):
+    # @todo can remove this if we require `fiftyone>=1.8.0`
+    if Version(foc.VERSION) >= Version("1.8.0"):
+        view = ctx.target_view()
+    else:
+        view = _get_target_view(ctx, params.get("target", None))
+
+    view = _get_shard_view(view, params["shard"])
+
+    yield from _compute_metadata_generator(
+        ctx,
+        view,
+        overwrite=params.get("overwrite", False),
+        header_only=params.get("header_only", False),
+        use_cache=params.get("use_cache", False),
+        cache_path=params.get("cache_path", None),
+        num_workers=params.get("num_workers", None),
+        adaptive_workers=params.get("adaptive_workers", False),
+        min_workers=params.get("min_workers", None),
+        num_video_workers=params.get("num_video_workers", None),
+        video_timeout=params.get("video_timeout", None),
+        enrichments=params.get("enrichments", None) or None,
+        batch_size=params.get("batch_size", None),
+        failures_field=params.get("failures_field", None) or None,
+        skip_failures=params.get("skip_failures", True),
+        warn_failures=False,
+        set_progress=set_progress,
+    )
+
+
+def _run_shards(
+    ctx,
+    operator_uri,
+    label,
+    shards,
+    params,
+    run_shard,
+    timeout=_SHARD_HEARTBEAT_TIMEOUT,
+):
+    """Queues a delegated operation per shard and waits for them to complete
+    while reporting their combined progress.
+
+    Shards that are running on another worker but whose status has not
+    changed in ``timeout`` seconds are assumed to be orphaned by a worker
+    that died, and are marked as failed.
+
+    Args:
+        ctx: the coordinating operation's execution context
+        operator_uri: the URI of the operator to run for each shard
+        label: a label for the shard operations
+        shards: a list of ``(shard, num_samples)`` tuples as returned by
+            :func:`_get_shard_ranges`
+        params: a list of parameters for each shard's operation
+        run_shard: a function that accepts ``(params, set_progress)`` and
+            runs a shard's operation in this process. It may return a
+            generator of updates to yield
+        timeout (3600): the number of seconds after which a running shard
+            whose status has not changed is marked as failed
+
+    Returns:
+        a list of ``(shard_index, error)`` tuples for any failed shards
+    """
+    num_total = sum(n for _, n in shards)
+
+    # Each shard is queued as its own operation, so any available workers
+    # can pick them up
+    service = food.DelegatedOperationService()
+    doc_ids = []
+    for idx, _params in enumerate(params, 1):
+        request_params = dict(ctx.request_params, params=_params)
+        doc = service.queue_operation(
+            operator=operator_uri,
+            label=f"{label} (shard {idx} of {len(shards)})",
+            delegation_target=ctx.delegation_target,
+            context=dict(request_params=request_params, params=_params),
+        )
+        doc_ids.append(doc.id)
+
+    terminal_states = (
+        fooe.ExecutionRunState.COMPLETED,
+        fooe.ExecutionRunState.FAILED,
+    )
+
+    heartbeats = {}
+
+    while True:
+        docs = [service.get(doc_id) for doc_id in doc_ids]
+
+        if _fail_stale_shards(service, docs, heartbeats, timeout):
+            docs = [service.get(doc_id) for doc_id in doc_ids]
+
+        num_done = 0
+        num_processed = 0
+        for doc, (_, n) in zip(docs, shards):
+            if doc.run_state in terminal_states:
+                num_done += 1
+                num_processed += n
+            elif doc.status is not None and doc.status.progress is not None:
+                num_processed += int(doc.status.progress * n)
+
+        ctx.set_progress(
+            progress=num_processed / num_total,
+            label=(
+                f"Processed {num_processed} of {num_total} "
+                f"({num_done} of {len(shards)} shards complete)"
+            ),
+        )
+
+        if num_done == len(shards):
+            break
+
+        # Process any shards that no worker has claimed yet rather than
+        # waiting, so that this operation never blocks on idle capacity
+        doc = next(
+            (
+                doc
+                for doc in docs
+                if doc.run_state == fooe.ExecutionRunState.QUEUED
+            ),
+            None,
+        )
+        if doc is None or not _claim_shard(service, doc.id):
+            time.sleep(_SHARD_POLL_INTERVAL)
+            continue
+
+        yield from _run_shard(service, doc, run_shard)
+
+        # Other shards were not observed while this one was running, so
+        # their heartbeats are measured from now
+        heartbeats.clear()
+
+    errors = []
+    for idx, doc in enumerate(docs, 1):
+        if doc.run_state == fooe.ExecutionRunState.FAILED:
+            error = doc.result.error if doc.result else None
+            errors.append((idx, error))
+
+    return errors
+
+
+def _fail_stale_shards(service, docs, heartbeats, timeout):
+    # A shard's heartbeat is any change to its last update time or progress.
+    # Staleness is measured with this process's clock so that it is immune to
+    # clock skew between workers
+    now = time.monotonic()
+
+    num_failed = 0
+    for doc in docs:
+        if doc.run_state != fooe.ExecutionRunState.RUNNING:
+            heartbeats.pop(doc.id, None)
+            continue
+
+        progress = doc.status.progress if doc.status is not None else None
+        beat = (getattr(doc, "updated_at", None), progress)
+
+        last_beat, last_time = heartbeats.get(doc.id, (None, None))
+        if last_time is None or beat != last_beat:
+            heartbeats[doc.id] = (beat, now)
+            continue
+
+        if now - last_time < timeout:
+            continue
+
+        error = (
+            "Shard was orphaned: its status has not changed in %d seconds"
+            % timeout
+        )
+        service.set_failed(doc.id, result=fooe.ExecutionResult(error=error))
+        heartbeats.pop(doc.id, None)
+        num_failed += 1
+
+    return num_failed
+
+
+def _claim_shard(service, doc_id):
+    doc = service.set_running(
+        doc_id, required_state=fooe.ExecutionRunState.QUEUED
+    )
+    return doc is not None
+
+
+def _run_shard(service, doc, run_shard):
+    params = doc.context.request_params["params"]
+
+    set_progress = lambda progress=None, label=None: service.set_progress(
+        doc.id, fooe.ExecutionProgress(progress=progress, label=label)
+    )
+
+    try:
+        updates = run_shard(params, set_progress)
+        if updates is not None:
+            yield from updates
+    except Exception:
+        result = fooe.ExecutionResult(error=traceback.format_exc())
+        service.set_failed(doc.id, result=result)
+    else:
+        service.set_completed(doc.id, result=fooe.ExecutionResult())
+
+
+def _get_shard_ranges(sample_collection, num_shards):
+    num_samples = len(sample_collection)
+    num_shards = max(1, min(num_shards, num_samples))
+
+    # Shards are contiguous ID ranges so that each one can be processed with
+    # indexed queries. Each shard is represented by its first ID, and the
+    # last shard is unbounded
+    shards = []
+    start = 0
+    for idx in range(num_shards):
+        end = ((idx + 1) * num_samples) // num_shards
+        if end <= start:
+            continue
+
+        first_id = sample_collection.mongo(
+            [{"$sort": {"_id": 1}}, {"$skip": start}, {"$limit": 1}]
+        ).values("id")[0]
+        shards.append([first_id, None, end - start])
+        start = end
+
+    for shard, next_shard in zip(shards, shards[1:]):
+        shard[1] = next_shard[0]
+
+    return [((first_id, next_id), n) for first_id, next_id, n in shards]
+
+
+def _get_shard_view(sample_collection, shard):
+    first_id, next_id = shard
+
+    match = {"$gte": ObjectId(first_id)}
+    if next_id is not None:
+        match["$lt"] = ObjectId(next_id)
+
+    return sample_collection.mongo([{"$match": {"_id": match}}])
+
+
+def _flush_metadata(
+    sample_collection,
+    values,
+    failures_field,
+    failures,
+    cache,
+    cache_entries,
+    dynamic=False,
+):
+    with _profile_phase("write metadata"):
+        # Enrichments are dynamic attributes of `metadata`, so they are
+        # declared on the dataset's schema when present
+        if values:
+            sample_collection.set_values(
+                "metadata", values, key_field="id", dynamic=dynamic
+            )
+
+        # Successful samples are included with `None` values so that failures
+        # from previous runs are cleared
+        if failures_field is not None and failures:
+            sample_collection.set_values(
+                failures_field, failures, key_field="id"
+            )
+
+        if cache is not None and cache_entries:
+            cache.add(cache_entries)
+
+
+def _iter_id_pages(sample_collection, fields, page_size):
+    # Pages are defined by ID ranges rather than `skip()` so that each page
+    # is an indexed query whose cost does not grow with the page offset
+    last_id = None
+    while True:
+        pipeline = []
+        if last_id is not None:
+            pipeline.append({"$match": {"_id": {"$gt": ObjectId(last_id)}}})
+
+        pipeline.extend([{"$sort": {"_id": 1}}, {"$limit": page_size}])
+
+        with _profile_phase("load samples"):
+            page = sample_collection.mongo(pipeline).values(
+                ["id"] + fields, _allow_missing=True
+            )
+
+        ids = page[0]
+        if not ids:
+            return
+
+        yield page
+
+        if len(ids) < page_size:
+            return
+
+        last_id = ids[-1]
+
+
+def _do_compute_metadata(args):
+    (
+        sample_id,
+        filepath,
+        media_type,
+        header_only,
+        video_timeout,
+        enrichments,
+        cache,
+    ) = args
+
+    if media_type != fom.IMAGE:
+        enrichments = None
+
+    fingerprint = None
+    if cache is not None:
+        fingerprint = _get_fingerprint(filepath)
+        metadata = cache.get(filepath, fingerprint)
+        if metadata is not None and _has_enrichments(metadata, enrichments):
+            return sample_id, filepath, metadata, None, None
+
+    try:
+        metadata = _get_metadata(
+            filepath,
+            media_type,
+            header_only=header_only,
+            video_timeout=video_timeout,
+            enrichments=enrichments,
+        )
+    except Exception as e:
+        failure = {"type": type(e).__name__, "message": str(e)}
+        return sample_id, filepath, None, None, failure
+
+    return sample_id, filepath, metadata, fingerprint, None
+
+
+_MAX_VIDEO_METADATA_CHUNK_SIZE = 16
+
+
+def _compute_video_metadata(pool, inputs, video_timeout, cache, num_workers):
+    # Cache lookups happen here because the cache cannot be shared with the
+    # worker processes
+    tasks = []
+    cached = []
+    for sample_id, filepath, _ in inputs:
+        fingerprint = None
+        if cache is not None:
+            fingerprint = _get_fingerprint(filepath)
+            metadata = cache.get(filepath, fingerprint)
+            if metadata is not None:
+                cached.append((sample_id, filepath, metadata, None, None))
+                continue
+
+        tasks.append((sample_id, filepath, fingerprint, video_timeout))
+
+    # Each worker receives several videos per task to amortize the IPC cost
+    chunksize = len(tasks) // (4 * num_workers)
+    chunksize = max(1, min(chunksize, _MAX_VIDEO_METADATA_CHUNK_SIZE))
+
+    # The tasks are dispatched to the workers immediately, and their results
+    # are deserialized as they are consumed
+    results = pool.imap_unordered(
+        _do_compute_video_metadata, tasks, chunksize=chunksize
+    )
+
+    return itertools.chain(cached, map(_parse_video_metadata_result, results))
+
+
+def _parse_video_metadata_result(result):
+    sample_id, filepath, metadata, fingerprint, failure = result
+    if metadata is not None:
+        metadata = fomm.Metadata.from_dict(metadata)
+
+    return sample_id, filepath, metadata, fingerprint, failure
+
+
+def _do_compute_video_metadata(args):
+    sample_id, filepath, fingerprint, video_timeout = args
+
+    try:
+        metadata = _get_video_metadata(filepath, timeout=video_timeout)
+    except Exception as e:
+        failure = {"type": type(e).__name__, "message": str(e)}
+        return sample_id, filepath, None, None, failure
+
+    return sample_id, filepath, metadata.to_dict(), fingerprint, None
+
+
+def _get_fingerprint(filepath):
+    if filepath.startswith("http"):
+        return None
+
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+_DEFAULT_METADATA_CACHE_PATH = os.path.join(
+    foc.FIFTYONE_CONFIG_DIR, "var", "metadata_cache.db"
+)
+
+
+class _MetadataCache(object):
+    """An on-disk SQLite cache of media metadata keyed by
+    ``(filepath, mode, mtime, size)``.
+
+    Metadata computed in different modes, such as from image headers only or
+    from a full read, is cached separately so that a run never returns
+    metadata computed in another mode.
+
+    A single connection is shared by all worker threads and guarded by a lock.
+    Each filepath has at most one entry per mode, so stale entries are
+    replaced rather than accumulated when files change.
+
+    Args:
+        path (None): the path to the cache database
+        mode ("full"): the mode in which the cached metadata is computed
+    """
+
+    def __init__(self, path=None, mode="full"):
+        if path is None:
+            path = _DEFAULT_METADATA_CACHE_PATH
+
+        etau.ensure_basedir(path)
+
+        self.mode = mode
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS metadata_by_mode ("
+                "filepath TEXT NOT NULL, "
+                "mode TEXT NOT NULL, "
+                "mtime INTEGER NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "metadata TEXT NOT NULL, "
+                "PRIMARY KEY (filepath, mode))"
+            )
+
+    def get(self, filepath, fingerprint):
+        """Retrieves the cached metadata for the given file, if any.
+
+        Args:
+            filepath: the filepath
+            fingerprint: the ``(mtime, size)`` of the file
+
+        Returns:
+            a :class:`fiftyone.core.metadata.Metadata`, or None
+        """
+        if fingerprint is None:
+            return None
+
+        mtime, size = fingerprint
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metadata FROM metadata_by_mode "
+                "WHERE filepath = ? AND mode = ? AND mtime = ? AND size = ?",
+                (filepath, self.mode, mtime, size),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return fomm.Metadata.from_dict(json.loads(row[0]))
+
+    def add(self, entries):
+        """Adds the given entries to the cache.
+
+        Args:
+            entries: a list of ``(filepath, (mtime, size), metadata)`` tuples
+        """
+        if not entries:
+            return
+
+        rows = [
+            (filepath, self.mode, mtime, size, json.dumps(metadata.to_dict()))
+            for filepath, (mtime, size), metadata in entries
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata_by_mode "
+                "(filepath, mode, mtime, size, metadata) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self):
+        """Closes the cache."""
+        with self._lock:
+            self._conn.close()
+
+
+def _get_metadata(
+    filepath,
+    media_type,
+    header_only=False,
+    video_timeout=None,
+    enrichments=None,
+):
+    if enrichments and media_type == fom.IMAGE:
+        return _get_enriched_image_metadata(filepath, enrichments)
+
+    metadata = None
+
+    if header_only and media_type == fom.IMAGE:
+        metadata = _probe_image_metadata(filepath)
+
+    if metadata is not None:
+        return metadata
+
+    if media_type == fom.IMAGE:
+        metadata = fomm.ImageMetadata.build_for(filepath)
+    elif media_type == fom.VIDEO:
+        metadata = _get_video_metadata(filepath, timeout=video_timeout)
+    elif media_type == getattr(fom, "THREE_D", None):
+        # @todo can remove `getattr()` if we require `fiftyone>=0.24.0`
+        metadata = fomm.SceneMetadata.build_for(filepath)
+    else:
+        metadata = fomm.Metadata.build_for(filepath)
+
+    return metadata
+
+
+def _get_video_metadata(filepath, timeout=None):
+    if timeout is None:
+        return fomm.VideoMetadata.build_for(filepath)
+
+    # `fomm.VideoMetadata.build_for()` cannot be interrupted, so `ffprobe` is
+    # run directly so that it can be killed if it does not finish within
+    # `timeout` seconds
+    args = [
+        "ffprobe",
+        "-loglevel",
+        "error",
+        "-show_format",
+        "-show_streams",
+        "-print_format",
+        "json",
+        "-i",
+        filepath,
+    ]
+
+    try:
+        p = subprocess.run(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=timeout,
+        )
+    except FileNotFoundError:
+        raise etau.ExecutableNotFoundError(exe="ffprobe")
+
+    if p.returncode != 0:
+        raise etau.ExecutableRuntimeError(" ".join(args), p.stderr)
+
+    info = json.loads(p.stdout.decode("utf-8"))
+
+    streams = info["streams"]
+    video_streams = [s for s in streams if s["codec_type"] == "video"]
+    stream_info = video_streams[0] if video_streams else streams[0]
+
+    stream_info = etav.VideoStreamInfo(
+        stream_info,
+        info["format"],
+        mime_type=etau.guess_mime_type(filepath),
+    )
+
+    return fomm.VideoMetadata(
+        size_bytes=stream_info.size_bytes,
+        mime_type=stream_info.mime_type,
+        frame_width=stream_info.frame_size[0],
+        frame_height=stream_info.frame_size[1],
+        frame_rate=stream_info.frame_rate,
+        total_frame_count=stream_info.total_frame_count,
+        duration=stream_info.duration,
+        encoding_str=stream_info.encoding_str,
+    )
+
+
+_METADATA_ENRICHMENTS = {
+    "phash": ("Perceptual hash", ["phash"]),
+    "dhash": ("Difference hash", ["dhash"]),
+    "content_hash": ("Content hash", ["content_hash"]),
+    "brightness": ("Brightness", ["brightness_mean", "brightness_std"]),
+    "blurhash": ("BlurHash", ["blurhash"]),
+}
+
+# Images are decoded at reduced resolution where supported, since all
+# enrichments only require small versions of the image
+_ENRICHMENT_DRAFT_SIZE = (256, 256)
+
+_BLURHASH_COMPONENTS = (4, 3)
+_BLURHASH_SIZE = (64, 64)
+_BLURHASH_CHARS = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "abcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+)
+
+
+def _has_enrichments(metadata, enrichments):
+    if not enrichments:
+        return True
+
+    return all(
+        getattr(metadata, attr, None) is not None
+        for name in enrichments
+        for attr in _METADATA_ENRICHMENTS[name][1]
+    )
+
+
+def _get_enriched_image_metadata(filepath, enrichments):
+    # The image is read once and all attributes are computed from the same
+    # buffer
+    if filepath.startswith("http"):
+        r = requests.get(filepath)
+        r.raise_for_status()
+        data = r.content
+    else:
+        with open(filepath, "rb") as f:
+            data = f.read()
+
+    width, height, num_channels = fomm.get_image_info(io.BytesIO(data))
+
+    metadata = fomm.ImageMetadata(
+        size_bytes=len(data),
+        mime_type=etau.guess_mime_type(filepath),
+        width=width,
+        height=height,
+        num_channels=num_channels,
+    )
+
+    if "content_hash" in enrichments:
+        metadata["content_hash"] = hashlib.sha1(data).hexdigest()
+
+    if not set(enrichments) - {"content_hash"}:
+        return metadata
+
+    img = Image.open(io.BytesIO(data))
+    img.draft("RGB", _ENRICHMENT_DRAFT_SIZE)
+    img = ImageOps.exif_transpose(img).convert("RGB")
+    gray = img.convert("L")
+
+    if "phash" in enrichments:
+        metadata["phash"] = _compute_phash(gray)
+
+    if "dhash" in enrichments:
+        metadata["dhash"] = _compute_dhash(gray)
+
+    if "brightness" in enrichments:
+        pixels = np.asarray(gray, dtype=float)
+        metadata["brightness_mean"] = float(pixels.mean())
+        metadata["brightness_std"] = float(pixels.std())
+
+    if "blurhash" in enrichments:
+        metadata["blurhash"] = _compute_blurhash(img)
+
+    return metadata
+
+
+def _compute_phash(gray, hash_size=8, highfreq_factor=4):
+    size = hash_size * highfreq_factor
+    pixels = np.asarray(gray.resize((size, size), Image.LANCZOS), dtype=float)
+
+    # 2D DCT-II via the DCT matrix
+    n = np.arange(size)
+    basis = np.cos(np.pi * np.outer(n, 2 * n + 1) / (2 * size))
+    dct = basis @ pixels @ basis.T
+
+    lowfreq = dct[:hash_size, :hash_size]
+    return _bits_to_hex(lowfreq > np.median(lowfreq))
+
+
+def _compute_dhash(gray, hash_size=8):
+    pixels = np.asarray(
+        gray.resize((hash_size + 1, hash_size), Image.LANCZOS), dtype=float
+    )
+    return _bits_to_hex(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _bits_to_hex(bits):
+    return np.packbits(bits.flatten()).tobytes().hex()
+
+
+def _compute_blurhash(img):
+    num_x, num_y = _BLURHASH_COMPONENTS
+
+    img = img.copy()
+    img.thumbnail(_BLURHASH_SIZE)
+    pixels = _srgb_to_linear(np.asarray(img, dtype=float))
+    height, width = pixels.shape[:2]
+
+    factors = []
+    for j in range(num_y):
+        basis_y = np.cos(np.pi * j * np.arange(height) / height)
+        for i in range(num_x):
+            basis_x = np.cos(np.pi * i * np.arange(width) / width)
+            basis = np.outer(basis_y, basis_x)[:, :, np.newaxis]
+            norm = 1.0 if i == 0 and j == 0 else 2.0
+            factor = norm * (basis * pixels).sum(axis=(0, 1))
+            factors.append(factor / (width * height))
+
+    dc = factors[0]
+    ac = np.array(factors[1:])
+
+    blurhash = _encode_base83((num_x - 1) + (num_y - 1) * 9, 1)
+
+    if len(ac) > 0:
+        max_ac = np.abs(ac).max()
+        quant_max = int(max(0, min(82, np.floor(max_ac * 166 - 0.5))))
+        max_value = (quant_max + 1) / 166
+    else:
+        quant_max = 0
+        max_value = 1
+
+    blurhash += _encode_base83(quant_max, 1)
+
+    r, g, b = (_linear_to_srgb(v) for v in dc)
+    blurhash += _encode_base83((r << 16) + (g << 8) + b, 4)
+
+    for factor in ac:
+        r, g, b = (_quantize_blurhash_ac(v, max_value) for v in factor)
+        blurhash += _encode_base83(r * 19 * 19 + g * 19 + b, 2)
+
+    return blurhash
+
+
+def _srgb_to_linear(values):
+    values = values / 255.0
+    return np.where(
+        values <= 0.04045,
+        values / 12.92,
+        ((values + 0.055) / 1.055) ** 2.4,
+    )
+
+
+def _quantize_blurhash_ac(value, max_value):
+    value = np.sign(value) * np.abs(value / max_value) ** 0.5
+    return int(np.clip(np.floor(value * 9 + 9.5), 0, 18))
+
+
+def _linear_to_srgb(value):
+    value = max(0.0, min(1.0, value))
+    if value <= 0.0031308:
+        return int(value * 12.92 * 255 + 0.5)
+
+    return int((1.055 * value ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _encode_base83(value, length):
+    chars = []
+    for i in range(1, length + 1):
+        digit = (value // 83 ** (length - i)) % 83
+        chars.append(_BLURHASH_CHARS[digit])
+
+    return "".join(chars)
+
+
+def _probe_image_metadata(filepath):
+    if filepath.startswith("http"):
+        return None
+
+    with open(filepath, "rb") as f:
+        head = f.read(32)
+
+        # Truncated or malformed headers fall back to a full read
+        try:
+            info = _probe_image_info(f, head)
+        except (struct.error, ValueError, IndexError):
+            info = None
+
+        if info is None:
+            return None
+
+        size_bytes = os.fstat(f.fileno()).st_size
+
+    width, height, num_channels = info
+
+    return fomm.ImageMetadata(
+        size_bytes=size_bytes,
+        mime_type=etau.guess_mime_type(filepath),
+        width=width,
+        height=height,
+        num_channels=num_channels,
+    )
+
+
+def _probe_image_info(f, head):
+    if head.startswith(b"\xff\xd8"):
+        return _probe_jpeg_info(f)
+
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return _probe_png_info(head)
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _probe_webp_info(head)
+
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return _probe_tiff_info(f, head)
+
+    return None
+
+
+# Start of frame markers, excluding DHT (C4), JPG (C8), and DAC (CC)
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Standalone markers that have no length field
+_JPEG_STANDALONE_MARKERS = set(range(0xD0, 0xD9)) | {0x01}
+
+_PNG_COLOR_TYPE_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _probe_jpeg_info(f):
+    # Like `fomm.ImageMetadata.build_for()`, the stored dimensions are
+    # reported without applying any EXIF orientation
+    f.seek(2)
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+
+        if byte != b"\xff":
+            continue
+
+        # Markers may be preceded by any number of 0xFF fill bytes
+        while byte == b"\xff":
+            byte = f.read(1)
+
+        if not byte:
+            return None
+
+        marker = byte[0]
+
+        if marker in _JPEG_STANDALONE_MARKERS or marker == 0x00:
+            continue
+
+        # EOI or SOS without a preceding SOF
+        if marker in (0xD9, 0xDA):
+            return None
+
+        (length,) = struct.unpack(">H", f.read(2))
+
+        if marker in _JPEG_SOF_MARKERS:
+            _, height, width, num_channels = struct.unpack(">BHHB", f.read(6))
+            return width, height, num_channels
+
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _probe_png_info(head):
+    if head[12:16] != b"IHDR":
+        return None
+
+    width, height = struct.unpack(">II", head[16:24])
+    num_channels = _PNG_COLOR_TYPE_CHANNELS.get(head[25], None)
+    if num_channels is None:
+        return None
+
+    return width, height, num_channels
+
+
+def _probe_webp_info(head):
+    chunk = head[12:16]
+
+    if chunk == b"VP8 ":
+        if head[23:26] != b"\x9d\x01\x2a":
+            return None
+
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF, 3
+
+    if chunk == b"VP8L":
+        if head[20] != 0x2F:
+            return None
+
+        (bits,) = struct.unpack("<I", head[21:25])
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        has_alpha = bool((bits >> 28) & 0x1)
+        return width, height, 4 if has_alpha else 3
+
+    if chunk == b"VP8X":
+        has_alpha = bool(head[20] & 0x10)
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height, 4 if has_alpha else 3
+
+    return None
+
+
+def _probe_tiff_info(f, head):
+    endian = _get_tiff_endian(head)
+    if endian is None:
+        return None
+
+    (offset,) = struct.unpack(endian + "I", head[4:8])
+    f.seek(offset)
+    (num_entries,) = struct.unpack(endian + "H", f.read(2))
+    entries = f.read(12 * num_entries)
 
-    try:
-        num_computed = 0
-        with contextlib.ExitStack() as exit_context:
-            pb = fou.ProgressBar(total=num_total)
-            exit_context.enter_context(pb)
+    tags = {}
+    for i in range(num_entries):
+        tag, value = _parse_tiff_entry(entries[12 * i : 12 * (i + 1)], endian)
+        tags[tag] = value
 
-            if num_workers > 1:
-                pool = multiprocessing.dummy.Pool(processes=num_workers)
-                exit_context.enter_context(pool)
-                tasks = pool.imap_unordered(_do_compute_metadata, inputs)
-            else:
-                tasks = map(_do_compute_metadata, inputs)
+    width = tags.get(256, None)
+    height = tags.get(257, None)
+    num_channels = tags.get(277, 1)
 
-            for sample_id, metadata in pb(tasks):
-                values[sample_id] = metadata
+    if width is None or height is None:
+        return None
 
-                num_computed += 1
-                if num_computed % 10 == 0:
-                    progress = num_computed / num_total
-                    label = f"Computed {num_computed} of {num_total}"
-                    yield ctx.trigger(
-                        "set_progress", dict(progress=progress, label=label)
-                    )
-    finally:
-        sample_collection.set_values("metadata", values, key_field="id")
+    return width, height, num_channels
 
-    if skip_failures and not warn_failures:
-        return
 
-    num_missing = len(sample_collection.exists("metadata", False)) + 1
-    if num_missing > 0:
-        msg = (
-            "Failed to populate metadata on %d samples. "
-            + 'Use `dataset.exists("metadata", False)` to retrieve them'
-        ) % num_missing
+def _get_tiff_endian(tiff):
+    if tiff[:4] == b"II*\x00":
+        return "<"
 
-        if skip_failures:
-            yield ctx.ops.notify(msg, variant="warning")
-        else:
-            yield ctx.ops.notify(msg, variant="error")
-            raise ValueError(msg)
+    if tiff[:4] == b"MM\x00*":
+        return ">"
 
+    return None
 
-def _do_compute_metadata(args):
-    sample_id, filepath, media_type = args
-    metadata = _compute_sample_metadata(
-        filepath, media_type, skip_failures=True
-    )
-    return sample_id, metadata
 
+def _parse_tiff_entry(entry, endian):
+    tag, type_, _ = struct.unpack(endian + "HHI", entry[:8])
 
-def _compute_sample_metadata(filepath, media_type, skip_failures=False):
-    if not skip_failures:
-        return _get_metadata(filepath, media_type)
+    if type_ == 3:
+        (value,) = struct.unpack(endian + "H", entry[8:10])
+    elif type_ == 4:
+        (value,) = struct.unpack(endian + "I", entry[8:12])
+    else:
+        value = None
 
-    try:
-        return _get_metadata(filepath, media_type)
-    except:
-        return None
+    return tag, value
 
 
-def _get_metadata(filepath, media_type):
-    if media_type == fom.IMAGE:
-        metadata = fomm.ImageMetadata.build_for(filepath)
-    elif media_type == fom.VIDEO:
-        metadata = fomm.VideoMetadata.build_for(filepath)
-    else:
-        metadata = fomm.Metadata.build_for(filepath)
+_DEFAULT_THUMBNAIL_BATCH_SIZE = 10000
+_DEFAULT_THUMBNAIL_QUALITY = 95
+_MIN_THUMBNAIL_QUALITY = 10
+_LOSSY_THUMBNAIL_FORMATS = {"JPEG", "WEBP", "AVIF"}
+_DEFAULT_THUMBNAIL_SHARD_SIZE = 512 * 1024**2
+_DEFAULT_VIDEO_THUMBNAIL_EXT = ".jpg"
+_POSTER_FRAME_POSITION = 0.1
 
-    return metadata
+# EXIF orientations that swap the width and height of the image
+_EXIF_ORIENTATION_TAG = 0x0112
+_EXIF_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
 
 
 class GenerateThumbnails(foo.Operator):
@@ -1856,6 +3726,7 @@ class GenerateThumbnails(foo.Operator):
             allow_immediate_execution=True,
             default_choice_to_delegated=True,
             dynamic=True,
+            execute_as_generator=True,
         )
 
     def __call__(
@@ -1865,8 +3736,17 @@ class GenerateThumbnails(foo.Operator):
         output_dir,
         width=None,
         height=None,
+        additional_thumbnails=None,
+        format=None,
+        quality=None,
+        max_bytes=None,
+        num_sprite_frames=None,
+        packed=False,
         overwrite=False,
+        incremental=False,
         num_workers=None,
+        adaptive_workers=False,
+        min_workers=None,
         delegate=False,
         delegation_target=None,
     ):
@@ -1894,6 +3774,65 @@ class GenerateThumbnails(foo.Operator):
                 delegate=True,
             )
 
+            # Only regenerate thumbnails whose media has changed or whose
+            # images are missing
+            generate_thumbnails(
+                dataset,
+                "thumbnail_path",
+                "/tmp/thumbnails",
+                height=32,
+                incremental=True,
+            )
+
+            # Generate multiple thumbnail sizes from a single read of each
+            # image
+            generate_thumbnails(
+                dataset,
+                "thumbnail_path",
+                "/tmp/thumbnails",
+                height=128,
+                additional_thumbnails=[
+                    ("thumbnail_path_256", None, 256),
+                    ("thumbnail_path_512", None, 512),
+                ],
+            )
+
+            # Encode WebP thumbnails of at most 10KB each
+            generate_thumbnails(
+                dataset,
+                "thumbnail_path",
+                "/tmp/thumbnails",
+                height=256,
+                format="webp",
+                max_bytes=10 * 1024,
+            )
+
+            # Generate poster frames and 16 frame scrub sprite sheets for
+            # a video dataset
+            video_dataset = foz.load_zoo_dataset("quickstart-video")
+            generate_thumbnails(
+                video_dataset,
+                "thumbnail_path",
+                "/tmp/video-thumbnails",
+                height=128,
+                num_sprite_frames=16,
+            )
+
+            # Pack thumbnails into large shard files rather than writing one
+            # file per sample
+            generate_thumbnails(
+                dataset,
+                "thumbnail",
+                "/tmp/thumbnail-shards",
+                height=128,
+                packed=True,
+            )
+
+            # Read the encoded bytes of a packed thumbnail
+            img_bytes = generate_thumbnails.read_packed_thumbnail(
+                dataset.first()["thumbnail"]
+            )
+
         Args:
             sample_collection: a
                 :class:`fiftyone.core.collections.SampleCollection`
@@ -1910,8 +3849,51 @@ class GenerateThumbnails(foo.Operator):
                 If omitted, the appropriate aspect-preserving value is computed
                 from the provided ``width``. At least one of ``width`` and
                 ``height`` must be provided
+            additional_thumbnails (None): an optional list of
+                ``(thumbnail_path, width, height)`` tuples describing
+                additional thumbnail sizes to generate from the same read of
+                each image. The thumbnails for each additional size are
+                written to a subdirectory of ``output_dir`` with the name of
+                their field
+            format (None): an optional image format, like ``"jpg"``,
+                ``"png"``, ``"webp"``, or ``"avif"``, in which to encode the
+                thumbnails. By default, the extension of each sample's media
+                is used
+            quality (None): an optional encoding quality in ``[1, 100]`` for
+                lossy formats. The default is ``95``
+            max_bytes (None): an optional maximum size, in bytes, for each
+                thumbnail. If provided, the highest quality, up to
+                ``quality``, whose encoding fits within this budget is used
+                for each thumbnail. Thumbnails that do not fit even at the
+                lowest quality are encoded at that quality. Only applicable
+                to lossy formats
+            num_sprite_frames (None): an optional number of evenly spaced
+                keyframes to tile into a scrub sprite sheet for each video.
+                Only applicable to video collections, whose thumbnails are
+                poster frames. The path to each sprite sheet is stored in a
+                ``<thumbnail_path>_sprite`` field, and a JSON index of the
+                timestamp and position of each tile is written alongside it
+            packed (False): whether to append the encoded thumbnails to
+                large shard files in ``output_dir`` rather than writing one
+                file per sample. In this case, each thumbnail field contains
+                a ``{"shard_path", "offset", "length"}`` dict that can be read
+                via :meth:`read_packed_thumbnail`, and the fields are not
+                registered as App media fields
             overwrite (False): whether to overwrite existing thumbnail images
+            incremental (False): whether to only (re)generate thumbnails for
+                samples whose thumbnail image is missing or whose media has
+                been modified since its thumbnail was generated, as recorded
+                in the ``<thumbnail_path>_source`` field. Samples without a
+                recorded source are regenerated
             num_workers (None): a suggested number of worker processes to use
+                when execution is delegated, or threads to use when running
+                immediately. When ``adaptive_workers`` is True, this is the
+                maximum number of threads to use
+            adaptive_workers (False): whether to automatically tune the number
+                of threads while running immediately based on the observed
+                throughput
+            min_workers (None): the minimum number of threads to use when
+                ``adaptive_workers`` is True. By default, 1 is used
             delegate (False): whether to delegate execution
             delegation_target (None): an optional orchestrator on which to
                 schedule the operation, if it is delegated
@@ -1919,81 +3901,814 @@ class GenerateThumbnails(foo.Operator):
         if isinstance(sample_collection, fo.DatasetView):
             ctx = dict(view=sample_collection)
         else:
-            ctx = dict(dataset=sample_collection)
+            ctx = dict(dataset=sample_collection)
+
+        params = dict(
+            thumbnail_path=thumbnail_path,
+            output_dir=_to_path(output_dir),
+            width=width,
+            height=height,
+            additional_thumbnails=[
+                dict(thumbnail_path=path, width=width, height=height)
+                for path, width, height in additional_thumbnails or []
+            ],
+            format=format,
+            quality=quality,
+            max_bytes=max_bytes,
+            num_sprite_frames=num_sprite_frames,
+            packed=packed,
+            overwrite=overwrite,
+            incremental=incremental,
+            num_workers=num_workers,
+            adaptive_workers=adaptive_workers,
+            min_workers=min_workers,
+        )
+
+        return foo.execute_operator(
+            self.uri,
+            ctx,
+            params=params,
+            request_delegation=delegate,
+            delegation_target=delegation_target,
+        )
+
+    def read_packed_thumbnail(self, thumbnail):
+        """Reads a thumbnail that was generated with ``packed=True``.
+
+        Args:
+            thumbnail: the ``{"shard_path", "offset", "length"}`` dict stored
+                in the sample's thumbnail field
+
+        Returns:
+            the encoded image bytes
+        """
+        return read_packed_thumbnail(thumbnail)
+
+    def resolve_input(self, ctx):
+        inputs = types.Object()
+
+        _generate_thumbnails_inputs(ctx, inputs)
+
+        return types.Property(
+            inputs, view=types.View(label="Generate thumbnails")
+        )
+
+    def execute(self, ctx):
+        target = ctx.params.get("target", None)
+        width = ctx.params.get("width", None)
+        height = ctx.params.get("height", None)
+        thumbnail_path = ctx.params["thumbnail_path"]
+        additional_thumbnails = ctx.params.get("additional_thumbnails", None)
+        format = ctx.params.get("format", None)
+        quality = ctx.params.get("quality", None)
+        max_bytes = ctx.params.get("max_bytes", None)
+        num_sprite_frames = ctx.params.get("num_sprite_frames", None)
+        packed = ctx.params.get("packed", False)
+        output_dir = _parse_path(ctx, "output_dir")
+        overwrite = ctx.params.get("overwrite", False)
+        incremental = ctx.params.get("incremental", False)
+        num_workers = ctx.params.get("num_workers", None)
+        adaptive_workers = ctx.params.get("adaptive_workers", False)
+        min_workers = ctx.params.get("min_workers", None)
+
+        view = _get_target_view(ctx, target)
+
+        thumbnails = [
+            (thumbnail_path, output_dir, (width or -1, height or -1))
+        ]
+        for d in additional_thumbnails or []:
+            path = d["thumbnail_path"]
+            thumbnails.append(
+                (
+                    path,
+                    os.path.join(output_dir, path),
+                    (d.get("width", None) or -1, d.get("height", None) or -1),
+                )
+            )
+
+        for update in _generate_thumbnails(
+            ctx,
+            view,
+            thumbnails,
+            format=format,
+            quality=quality,
+            max_bytes=max_bytes,
+            num_sprite_frames=num_sprite_frames,
+            packed=packed,
+            overwrite=overwrite,
+            incremental=incremental,
+            num_workers=num_workers,
+            adaptive_workers=adaptive_workers,
+            min_workers=min_workers,
+        ):
+            yield update
+
+        # Packed thumbnails are not individual files, so the App cannot load
+        # them as media
+        if not packed:
+            for path, _, _ in thumbnails:
+                if path not in ctx.dataset.app_config.media_fields:
+                    ctx.dataset.app_config.media_fields.append(path)
+
+            if ctx.dataset.app_config.grid_media_field != thumbnail_path:
+                ctx.dataset.app_config.grid_media_field = thumbnail_path
+
+            ctx.dataset.save()
+
+        if not ctx.delegated:
+            yield ctx.trigger("reload_dataset")
+
+
+def _generate_thumbnails(
+    ctx,
+    sample_collection,
+    thumbnails,
+    format=None,
+    quality=None,
+    max_bytes=None,
+    num_sprite_frames=None,
+    packed=False,
+    overwrite=False,
+    incremental=False,
+    num_workers=None,
+    adaptive_workers=False,
+    min_workers=None,
+    batch_size=None,
+):
+    if batch_size is None:
+        batch_size = _DEFAULT_THUMBNAIL_BATCH_SIZE
+
+    if quality is None:
+        quality = _DEFAULT_THUMBNAIL_QUALITY
+
+    is_video = sample_collection.media_type == fom.VIDEO
+
+    if format is not None:
+        ext = "." + format.lower().lstrip(".")
+        if ext not in Image.registered_extensions():
+            raise ValueError("Unsupported thumbnail format '%s'" % format)
+    elif is_video:
+        ext = _DEFAULT_VIDEO_THUMBNAIL_EXT
+    else:
+        ext = None
+
+    encoding = (quality, max_bytes)
+
+    # No multiprocessing allowed when running synchronously, but Pillow
+    # releases the GIL while decoding, resizing, and encoding, so threads
+    # are used instead
+    if ctx.delegated:
+        num_workers = fou.recommend_process_pool_workers(num_workers)
+    elif hasattr(fou, "recommend_thread_pool_workers"):
+        # @todo can remove this if we require `fiftyone>=0.22.2`
+        num_workers = fou.recommend_thread_pool_workers(num_workers)
+    elif num_workers is None:
+        num_workers = fo.config.max_thread_pool_workers or 8
+
+    if adaptive_workers and not ctx.delegated:
+        pool = _AdaptiveThreadPool(min_workers or 1, num_workers)
+    else:
+        pool = None
+
+    thumbnail_paths = [path for path, _, _ in thumbnails]
+
+    # The source media's modification time and size are recorded alongside
+    # each thumbnail so that incremental runs can detect changed media
+    source_field = _get_thumbnail_source_field(thumbnail_paths[0])
+
+    for _, output_dir, _ in thumbnails:
+        etau.ensure_dir(output_dir)
+
+    # Sprite sheets are stored as an additional output field of each video
+    if is_video and num_sprite_frames:
+        sprite_field = _get_thumbnail_sprite_field(thumbnail_paths[0])
+        sprite_dir = os.path.join(thumbnails[0][1], sprite_field)
+        output_paths = thumbnail_paths + [sprite_field]
+    else:
+        sprite_field = None
+        output_paths = thumbnail_paths
+
+    # Outputs are written to the unfiltered collection because samples drop
+    # out of the filtered view as soon as their thumbnails are populated
+    target_collection = sample_collection
+
+    if not (overwrite or incremental):
+        if len(output_paths) == 1:
+            sample_collection = sample_collection.exists(
+                output_paths[0], False
+            )
+        else:
+            sample_collection = sample_collection.match(
+                F.any([~F(path).exists() for path in output_paths])
+            )
+
+    num_total = len(sample_collection)
+    if num_total == 0:
+        return
+
+    num_failed = 0
+
+    kwargs = {}
+
+    # @todo can remove version check if we require `fiftyone>=1.6.0`
+    if ctx.delegated and Version(foc.VERSION) >= Version("1.6.0"):
+        progress = lambda pb: ctx.set_progress(progress=pb.progress)
+        kwargs["progress"] = fo.report_progress(progress, dt=10.0)
+
+    pages = _iter_id_pages(
+        sample_collection,
+        ["filepath", source_field] + output_paths,
+        batch_size,
+    )
+
+    with contextlib.ExitStack() as exit_context:
+        pb = fou.ProgressBar(total=num_total, **kwargs)
+        exit_context.enter_context(pb)
+
+        if packed:
+            writers = [
+                exit_context.enter_context(
+                    _ThumbnailShardWriter(output_dir, path)
+                )
+                for path, output_dir, _ in thumbnails
+            ]
+        else:
+            writers = None
+
+        if pool is not None:
+            exit_context.enter_context(pool)
+            imap = pool.imap_unordered
+        elif num_workers > 1:
+            if ctx.delegated:
+                mp_ctx = fou.get_multiprocessing_context()
+                _pool = mp_ctx.Pool(processes=num_workers)
+            else:
+                _pool = multiprocessing.dummy.Pool(processes=num_workers)
+
+            exit_context.enter_context(_pool)
+            imap = _pool.imap_unordered
+        else:
+            imap = map
+
+        if is_video:
+            worker = _do_generate_video_thumbnails
+        else:
+            worker = _do_generate_thumbnails
+
+        for ids, filepaths, sources, *outpaths in pages:
+            inputs = []
+            fingerprints = {}
+            for sample_id, filepath, source, _outpaths in zip(
+                ids, filepaths, sources, zip(*outpaths)
+            ):
+                fingerprint = _get_thumbnail_source(filepath)
+
+                if incremental and not any(
+                    _is_thumbnail_stale(outpath, source, fingerprint)
+                    for outpath in _outpaths
+                ):
+                    pb.update()
+                    continue
+
+                # Thumbnails are named by sample ID so that media with the
+                # same basename in different directories cannot collide
+                filename = _get_thumbnail_filename(sample_id, filepath, ext)
+
+                outputs = [
+                    (os.path.join(output_dir, filename), size)
+                    for _, output_dir, size in thumbnails
+                ]
+                args = (sample_id, filepath, outputs, encoding, packed)
+
+                if is_video:
+                    if sprite_field is not None:
+                        sprite = (
+                            os.path.join(sprite_dir, filename),
+                            num_sprite_frames,
+                        )
+                    else:
+                        sprite = None
+
+                    args += (sprite,)
+
+                inputs.append(args)
+                fingerprints[sample_id] = fingerprint
+
+            values = [{} for _ in output_paths]
+            for sample_id, _outpaths in imap(worker, inputs):
+                pb.update()
+
+                if not ctx.delegated and pb.iteration % 10 == 0:
+                    label = f"Processed {pb.iteration} of {num_total}"
+                    if pool is not None:
+                        label += f" ({pool.num_workers} workers)"
+
+                    yield ctx.trigger(
+                        "set_progress",
+                        dict(progress=pb.iteration / num_total, label=label),
+                    )
+
+                if _outpaths is None:
+                    num_failed += 1
+                    del fingerprints[sample_id]
+                    continue
+
+                if packed:
+                    _outpaths = [
+                        writer.write(data)
+                        for writer, data in zip(writers, _outpaths)
+                    ] + _outpaths[len(writers) :]
+
+                for _values, outpath in zip(values, _outpaths):
+                    _values[sample_id] = outpath
+
+            # Shards must be durable before the database references them
+            if packed:
+                for writer in writers:
+                    writer.flush()
+
+            for path, _values in zip(output_paths, values):
+                if _values:
+                    target_collection.set_values(path, _values, key_field="id")
+
+            if fingerprints:
+                target_collection.set_values(
+                    source_field, fingerprints, key_field="id"
+                )
+
+    if num_failed > 0:
+        yield ctx.ops.notify(
+            f"Failed to generate thumbnails for {num_failed} samples",
+            variant="warning",
+        )
+
+
+def _get_thumbnail_filename(sample_id, filepath, ext):
+    if ext is None:
+        ext = os.path.splitext(filepath)[1]
+
+    return sample_id + ext
+
+
+def _do_generate_thumbnails(args):
+    sample_id, inpath, outputs, encoding, packed = args
+
+    try:
+        results = _generate_thumbnail_images(
+            inpath, outputs, encoding, packed=packed
+        )
+    except Exception:
+        return sample_id, None
+
+    return sample_id, results
+
+
+def _generate_thumbnail_images(inpath, outputs, encoding, packed=False):
+    with Image.open(inpath) as img:
+        isize = img.size
+        orientation = img.getexif().get(_EXIF_ORIENTATION_TAG, 1)
+        if orientation in _EXIF_TRANSPOSED_ORIENTATIONS:
+            isize = isize[::-1]
+
+        outputs = _get_thumbnail_sizes(outputs, isize)
+
+        # The image is decoded once, at a reduced scale if the format
+        # supports it, and each thumbnail is downscaled from the next largest
+        max_size = max(max(size) for _, _, size in outputs)
+        img.draft(None, (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+
+        return _write_thumbnail_images(img, outputs, encoding, packed=packed)
+
+
+def _write_thumbnail_images(img, outputs, encoding, packed=False):
+    quality, max_bytes = encoding
+
+    results = []
+    for idx, outpath, size in outputs:
+        if img.size != size:
+            img = img.resize(size, Image.BICUBIC, reducing_gap=2.0)
+
+        ext = os.path.splitext(outpath)[1]
+        data = _encode_thumbnail(img, ext, quality, max_bytes=max_bytes)
+
+        # Packed thumbnails are returned so that the caller can append them
+        # to its shards
+        if packed:
+            results.append((idx, data))
+        else:
+            etau.ensure_basedir(outpath)
+            with open(outpath, "wb") as f:
+                f.write(data)
+
+            results.append((idx, outpath))
+
+    return [result for _, result in sorted(results)]
+
+
+def _get_thumbnail_sizes(outputs, isize):
+    # Sorted from largest to smallest so that each thumbnail can be
+    # downscaled from the previous one
+    outputs = [
+        (idx, outpath, etai.infer_missing_dims(size, isize))
+        for idx, (outpath, size) in enumerate(outputs)
+    ]
+    outputs.sort(key=lambda o: o[2][0] * o[2][1], reverse=True)
+    return outputs
+
+
+def _do_generate_video_thumbnails(args):
+    sample_id, inpath, outputs, encoding, packed, sprite = args
+
+    try:
+        results = _generate_video_thumbnail_images(
+            inpath, outputs, encoding, sprite=sprite, packed=packed
+        )
+    except Exception:
+        return sample_id, None
+
+    return sample_id, results
+
+
+def _generate_video_thumbnail_images(
+    inpath, outputs, encoding, sprite=None, packed=False
+):
+    if sprite is not None:
+        sprite_path, num_frames = sprite
+    else:
+        num_frames = None
+
+    # Keyframes are decoded at a scale at least as large as every requested
+    # thumbnail, and are tiled into the sprite at the primary thumbnail size
+    max_size = max(max(size) for _, size in outputs)
+    tile_size = outputs[0][1]
+
+    poster = None
+    img = None
+    tiles = {}
+    keyframes = []
+    for timestamp, duration, img in _iter_video_keyframes(inpath, max_size):
+        if poster is None and (
+            duration is None or timestamp >= _POSTER_FRAME_POSITION * duration
+        ):
+            poster = img
+
+        if num_frames is None:
+            if poster is not None:
+                break
+
+            continue
+
+        tile = img.resize(
+            etai.infer_missing_dims(tile_size, img.size),
+            Image.BICUBIC,
+            reducing_gap=2.0,
+        )
+
+        # When the duration is known, each keyframe is assigned to one of
+        # `num_frames` evenly spaced slots so that only one tile per slot is
+        # kept in memory
+        if duration:
+            idx = min(int(num_frames * timestamp / duration), num_frames - 1)
+            if idx not in tiles:
+                tiles[idx] = (timestamp, tile)
+        else:
+            keyframes.append((timestamp, tile))
+
+    if img is None:
+        raise ValueError("Failed to decode any keyframes from '%s'" % inpath)
+
+    # Fall back to the last keyframe for videos shorter than the poster
+    # position
+    if poster is None:
+        poster = img
+
+    outputs = _get_thumbnail_sizes(outputs, poster.size)
+    results = _write_thumbnail_images(poster, outputs, encoding, packed=packed)
+
+    if num_frames is not None:
+        if not tiles:
+            step = max(1, len(keyframes) / num_frames)
+            tiles = {
+                idx: keyframes[int(idx * step)]
+                for idx in range(min(num_frames, len(keyframes)))
+            }
+
+        _write_sprite_sheet(
+            [tiles[idx] for idx in sorted(tiles)], sprite_path, encoding
+        )
+        results.append(sprite_path)
+
+    return results
+
+
+def _write_sprite_sheet(tiles, sprite_path, encoding):
+    quality, _ = encoding
+
+    tile_width, tile_height = tiles[0][1].size
+    num_cols = math.ceil(math.sqrt(len(tiles)))
+    num_rows = math.ceil(len(tiles) / num_cols)
+
+    sprite = Image.new("RGB", (num_cols * tile_width, num_rows * tile_height))
+    frames = []
+    for idx, (timestamp, tile) in enumerate(tiles):
+        x = (idx % num_cols) * tile_width
+        y = (idx // num_cols) * tile_height
+        sprite.paste(tile, (x, y))
+        frames.append({"timestamp": timestamp, "x": x, "y": y})
+
+    ext = os.path.splitext(sprite_path)[1]
+    data = _encode_thumbnail(sprite, ext, quality)
+
+    etau.ensure_basedir(sprite_path)
+    with open(sprite_path, "wb") as f:
+        f.write(data)
+
+    index = {
+        "tile_width": tile_width,
+        "tile_height": tile_height,
+        "num_cols": num_cols,
+        "num_rows": num_rows,
+        "frames": frames,
+    }
+    index_path = os.path.splitext(sprite_path)[0] + ".json"
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+
+_FFMPEG_DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_FFMPEG_PTS_TIME_PATTERN = re.compile(
+    r"\bn:\s*\d+\b.*\bpts_time:\s*(-?[\d.]+)"
+)
+
+
+def _iter_video_keyframes(inpath, size):
+    """Yields ``(timestamp, duration, img)`` tuples for each keyframe of the
+    given video in a single sequential pass.
+
+    Only keyframes are decoded, and they are scaled by ``ffmpeg`` so that
+    their smaller dimension is ``size``. Frames are streamed as PPM images
+    over stdout, and their timestamps are parsed from the ``showinfo`` filter
+    on stderr.
+    """
+    args = [
+        "ffmpeg",
+        "-nostdin",
+        "-loglevel",
+        "info",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        inpath,
+        "-an",
+        "-sn",
+        "-vf",
+        "showinfo,scale=%d:%d:force_original_aspect_ratio=increase"
+        % (size, size),
+        "-vsync",
+        "passthrough",
+        "-f",
+        "image2pipe",
+        "-c:v",
+        "ppm",
+        "-",
+    ]
+
+    try:
+        p = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        raise etau.ExecutableNotFoundError(exe="ffmpeg")
+
+    # stderr must be drained concurrently with stdout to avoid deadlock
+    events = queue.Queue()
+    stderr = []
+    reader = threading.Thread(
+        target=_read_ffmpeg_stderr, args=(p.stderr, events, stderr)
+    )
+    reader.start()
+
+    try:
+        duration = None
+        while True:
+            img = _read_ppm_frame(p.stdout)
+            if img is None:
+                break
+
+            while True:
+                key, value = events.get()
+                if key == "duration":
+                    duration = value
+                elif key == "pts_time":
+                    timestamp = value
+                    break
+                else:
+                    raise ValueError(
+                        "Failed to parse keyframe timestamps for '%s'" % inpath
+                    )
+
+            yield timestamp, duration, img
+    except BaseException:
+        p.kill()
+        raise
+    finally:
+        p.stdout.close()
+        p.wait()
+        reader.join()
+
+    if p.returncode != 0:
+        raise etau.ExecutableRuntimeError(" ".join(args), b"".join(stderr))
+
+
+def _read_ffmpeg_stderr(f, events, stderr):
+    for line in f:
+        stderr.append(line)
+
+        _line = line.decode("utf-8", errors="replace")
+
+        m = _FFMPEG_PTS_TIME_PATTERN.search(_line)
+        if m:
+            events.put(("pts_time", float(m.group(1))))
+            continue
+
+        m = _FFMPEG_DURATION_PATTERN.search(_line)
+        if m:
+            hours, minutes, seconds = m.groups()
+            duration = 3600 * int(hours) + 60 * int(minutes) + float(seconds)
+            events.put(("duration", duration))
+
+    events.put(("eof", None))
+
+
+def _read_ppm_frame(f):
+    # ffmpeg writes binary PPM images with a header of the form
+    # `P6\n<width> <height>\n<maxval>\n`
+    header = []
+    while len(header) < 4:
+        line = f.readline()
+        if not line:
+            return None
+
+        header.extend(line.split())
+
+    if header[0] != b"P6":
+        raise ValueError("Unexpected frame format '%s'" % header[0])
+
+    width, height = int(header[1]), int(header[2])
+    data = f.read(3 * width * height)
+    if len(data) < 3 * width * height:
+        return None
+
+    return Image.frombytes("RGB", (width, height), data)
+
+
+def _encode_thumbnail(img, ext, quality, max_bytes=None):
+    ext = ext.lower()
+    if ext in (".jpg", ".jpeg") and img.mode not in ("L", "RGB", "CMYK"):
+        img = img.convert("RGB")
+
+    fmt = Image.registered_extensions()[ext]
+
+    data = _encode_image(img, fmt, quality)
+    if max_bytes is None or len(data) <= max_bytes:
+        return data
+
+    if fmt not in _LOSSY_THUMBNAIL_FORMATS:
+        return data
+
+    # Binary search for the highest quality whose encoding fits the budget.
+    # Encoded size is monotonic in quality for practical purposes
+    best = None
+    lo, hi = _MIN_THUMBNAIL_QUALITY, quality - 1
+    while lo <= hi:
+        q = (lo + hi) // 2
+        _data = _encode_image(img, fmt, q)
+        if len(_data) <= max_bytes:
+            best = _data
+            lo = q + 1
+        else:
+            data = _data
+            hi = q - 1
 
-        params = dict(
-            thumbnail_path=thumbnail_path,
-            output_dir=_to_path(output_dir),
-            width=width,
-            height=height,
-            overwrite=overwrite,
-            num_workers=num_workers,
-        )
+    # If nothing fits, `data` is the lowest quality encoding
+    return best if best is not None else data
 
-        return foo.execute_operator(
-            self.uri,
-            ctx,
-            params=params,
-            request_delegation=delegate,
-            delegation_target=delegation_target,
-        )
 
-    def resolve_input(self, ctx):
-        inputs = types.Object()
+def _encode_image(img, fmt, quality):
+    with io.BytesIO() as f:
+        img.save(f, format=fmt, quality=quality)
+        return f.getvalue()
 
-        _generate_thumbnails_inputs(ctx, inputs)
 
-        return types.Property(
-            inputs, view=types.View(label="Generate thumbnails")
-        )
+def read_packed_thumbnail(thumbnail):
+    """Reads a thumbnail that was generated by
+    :class:`GenerateThumbnails` with ``packed=True``.
 
-    def execute(self, ctx):
-        target = ctx.params.get("target", None)
-        width = ctx.params.get("width", None)
-        height = ctx.params.get("height", None)
-        thumbnail_path = ctx.params["thumbnail_path"]
-        output_dir = _parse_path(ctx, "output_dir")
-        overwrite = ctx.params.get("overwrite", False)
-        num_workers = ctx.params.get("num_workers", None)
+    Args:
+        thumbnail: the ``{"shard_path", "offset", "length"}`` dict stored in
+            the sample's thumbnail field
 
-        view = _get_target_view(ctx, target)
+    Returns:
+        the encoded image bytes
+    """
+    with open(thumbnail["shard_path"], "rb") as f:
+        return os.pread(f.fileno(), thumbnail["length"], thumbnail["offset"])
 
-        if not overwrite:
-            view = view.exists(thumbnail_path, False)
 
-        size = (width or -1, height or -1)
+class _ThumbnailShardWriter(object):
+    def __init__(self, output_dir, prefix, max_shard_size=None):
+        if max_shard_size is None:
+            max_shard_size = _DEFAULT_THUMBNAIL_SHARD_SIZE
 
-        # No multiprocessing allowed when running synchronously
-        if not ctx.delegated:
-            num_workers = 0
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.max_shard_size = max_shard_size
 
-        kwargs = {}
+        self._f = None
+        self._shard_path = None
+        self._offset = 0
 
-        # @todo can remove version check if we require `fiftyone>=1.6.0`
-        if ctx.delegated and Version(foc.VERSION) >= Version("1.6.0"):
-            progress = lambda pb: ctx.set_progress(progress=pb.progress)
-            kwargs["progress"] = fo.report_progress(progress, dt=10.0)
+    def __enter__(self):
+        return self
 
-        foui.transform_images(
-            view,
-            size=size,
-            output_field=thumbnail_path,
-            output_dir=output_dir,
-            num_workers=num_workers,
-            skip_failures=True,
-            **kwargs,
-        )
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, data):
+        if self._f is None or (
+            self._offset > 0 and self._offset + len(data) > self.max_shard_size
+        ):
+            self._open_shard()
 
-        if thumbnail_path not in ctx.dataset.app_config.media_fields:
-            ctx.dataset.app_config.media_fields.append(thumbnail_path)
+        offset = self._offset
+        self._f.write(data)
+        self._offset += len(data)
 
-        if ctx.dataset.app_config.grid_media_field != thumbnail_path:
-            ctx.dataset.app_config.grid_media_field = thumbnail_path
+        return {
+            "shard_path": self._shard_path,
+            "offset": offset,
+            "length": len(data),
+        }
 
-        ctx.dataset.save()
+    def flush(self):
+        if self._f is not None:
+            self._f.flush()
+            os.fsync(self._f.fileno())
 
-        if not ctx.delegated:
-            ctx.trigger("reload_dataset")
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def _open_shard(self):
+        self.close()
+
+        # Each run writes to new shards, so existing shards are never
+        # modified while they may be being read
+        filename = "%s-%s.shard" % (self.prefix, ObjectId())
+        self._shard_path = os.path.join(self.output_dir, filename)
+        etau.ensure_basedir(self._shard_path)
+        self._f = open(self._shard_path, "wb")
+        self._offset = 0
+
+
+def _get_thumbnail_source_field(thumbnail_path):
+    return thumbnail_path + "_source"
+
+
+def _get_thumbnail_sprite_field(thumbnail_path):
+    return thumbnail_path + "_sprite"
+
+
+def _get_thumbnail_source(filepath):
+    fingerprint = _get_fingerprint(filepath)
+    if fingerprint is None:
+        return None
+
+    mtime, size = fingerprint
+    return {"mtime": mtime, "size": size}
+
+
+def _is_thumbnail_stale(thumbnail, source, fingerprint):
+    if thumbnail is None:
+        return True
+
+    if isinstance(thumbnail, dict):
+        shard_path = thumbnail["shard_path"]
+        end = thumbnail["offset"] + thumbnail["length"]
+        if not os.path.isfile(shard_path) or os.path.getsize(shard_path) < end:
+            return True
+    elif not os.path.isfile(thumbnail):
+        return True
+
+    # Media whose modification time and size cannot be determined (eg URLs)
+    # are only regenerated if their thumbnail is missing
+    if fingerprint is None:
+        return False
+
+    return source != fingerprint
 
 
 def _generate_thumbnails_inputs(ctx, inputs):
@@ -2084,25 +4799,49 @@ def _generate_thumbnails_inputs(ctx, inputs):
         return False
 
     inputs.bool(
-        "overwrite",
+        "incremental",
         default=False,
-        label=(
-            f"Regenerate thumbnails for samples that already have their "
-            f"{thumbnail_path} populated?"
+        label="Only regenerate changed or missing thumbnails?",
+        description=(
+            "Whether to only (re)generate thumbnails for samples whose media "
+            "has been modified since their thumbnail was generated or whose "
+            "thumbnail image is missing"
         ),
         view=types.CheckboxView(),
     )
 
+    incremental = ctx.params.get("incremental", False)
+
+    if not incremental:
+        inputs.bool(
+            "overwrite",
+            default=False,
+            label=(
+                f"Regenerate thumbnails for samples that already have their "
+                f"{thumbnail_path} populated?"
+            ),
+            view=types.CheckboxView(),
+        )
+
     overwrite = ctx.params.get("overwrite", False)
 
-    if overwrite:
+    if incremental:
+        n = len(target_view)
+        if n > 0:
+            label = (
+                f"Found {n} samples whose thumbnails will be regenerated if "
+                "their media has changed or their thumbnail is missing"
+            )
+        else:
+            label = f"Your {target_str} is empty"
+    elif overwrite:
         n = len(target_view)
         if n > 0:
             label = f"Found {n} samples to (re)generate thumbnails for"
         else:
             label = f"Your {target_str} is empty"
     else:
-        n = len(target_view.exists("thumbnail_path", False))
+        n = len(target_view.exists(thumbnail_path, False))
         if n > 0:
             label = f"Found {n} samples that need thumbnails generated"
         else:
@@ -2156,17 +4895,133 @@ def _generate_thumbnails_inputs(ctx, inputs):
         status2.invalid = True
         return False
 
+    thumbnail_schema = types.Object()
+    thumbnail_schema.str(
+        "thumbnail_path",
+        required=True,
+        label="Thumbnail field",
+        view=types.View(space=4),
+    )
+    thumbnail_schema.int(
+        "width", required=False, label="Width", view=types.View(space=4)
+    )
+    thumbnail_schema.int(
+        "height", required=False, label="Height", view=types.View(space=4)
+    )
+
+    inputs.list(
+        "additional_thumbnails",
+        thumbnail_schema,
+        default=None,
+        required=False,
+        label="Additional sizes",
+        description=(
+            "Optional additional thumbnail sizes to generate from the same "
+            "read of each image. Each size is written to a subdirectory of "
+            "the output directory named after its field"
+        ),
+    )
+
+    formats = _get_thumbnail_formats()
+    format_choices = types.DropdownView()
+    for fmt in formats:
+        format_choices.add_choice(fmt, label=fmt.upper())
+
+    inputs.enum(
+        "format",
+        format_choices.values(),
+        default=None,
+        required=False,
+        label="Format",
+        description=(
+            "An optional image format in which to encode the thumbnails. By "
+            "default, the format of each sample's media is used"
+        ),
+        view=format_choices,
+    )
+
+    inputs.int(
+        "quality",
+        default=None,
+        required=False,
+        label="Quality",
+        description=(
+            "An optional encoding quality in [1, 100] for lossy formats. The "
+            f"default is {_DEFAULT_THUMBNAIL_QUALITY}"
+        ),
+        view=types.View(space=6),
+    )
+
+    inputs.int(
+        "max_bytes",
+        default=None,
+        required=False,
+        label="Max bytes",
+        description=(
+            "An optional maximum size for each thumbnail, in bytes. The "
+            "highest quality whose encoding fits is used for each thumbnail"
+        ),
+        view=types.View(space=6),
+    )
+
+    if target_view.media_type == fom.VIDEO:
+        inputs.int(
+            "num_sprite_frames",
+            default=None,
+            required=False,
+            label="Num sprite frames",
+            description=(
+                "The thumbnails of videos are poster frames. You can also "
+                "provide a number of evenly spaced keyframes to tile into a "
+                "scrub sprite sheet for each video, whose path is stored in "
+                f"a '{thumbnail_path}_sprite' field"
+            ),
+        )
+
+    inputs.bool(
+        "packed",
+        default=False,
+        required=False,
+        label="Packed",
+        description=(
+            "Whether to append the thumbnails to large shard files in the "
+            "output directory rather than writing one file per thumbnail. "
+            "Packed thumbnails can be read in code but are not displayed in "
+            "the App"
+        ),
+        view=types.CheckboxView(),
+    )
+
     inputs.int(
         "num_workers",
         default=None,
         required=False,
         label="Num workers",
-        description="An optional number of workers to use",
+        description=(
+            "An optional number of workers to use, or the maximum number of "
+            "threads to use if adaptive workers are enabled"
+        ),
+    )
+
+    inputs.bool(
+        "adaptive_workers",
+        default=False,
+        label="Adaptive workers?",
+        description=(
+            "Whether to automatically tune the number of threads based on "
+            "the observed throughput when running immediately"
+        ),
     )
 
     return True
 
 
+def _get_thumbnail_formats():
+    # AVIF requires Pillow>=11.2 or the `pillow-avif-plugin` package
+    exts = Image.registered_extensions()
+    return [fmt for fmt in ("jpg", "png", "webp", "avif") if "." + fmt in exts]
+
+
 def _get_sample_fields(sample_collection, field_types):
     schema = sample_collection.get_field_schema(flat=True)
     bad_roots = tuple(
@@ -2208,6 +5063,127 @@ def _get_target_view(ctx, target):
     return ctx.view
 
 
+class _AdaptiveThreadPool(object):
+    """A thread pool that tunes its concurrency while running via additive
+    increase/multiplicative decrease (AIMD) of its observed throughput.
+
+    Concurrency starts at ``min_workers`` and doubles after each window of
+    completed tasks until throughput first drops. Thereafter, it grows by one
+    worker per window while throughput holds and is halved whenever
+    throughput drops more than ``tolerance`` below the best throughput
+    observed since the last decrease.
+
+    Args:
+        min_workers: the minimum number of concurrent tasks
+        max_workers: the maximum number of concurrent tasks
+        tolerance (0.1): the fractional drop in throughput between windows
+            that triggers a decrease in concurrency
+    """
+
+    def __init__(self, min_workers, max_workers, tolerance=0.1):
+        min_workers = max(1, min_workers)
+        max_workers = max(min_workers, max_workers)
+
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.tolerance = tolerance
+        self.num_workers = min_workers
+
+        self._executor = None
+        self._slow_start = True
+        self._best_throughput = None
+        self._window_start = None
+        self._window_count = 0
+
+    def __enter__(self):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        )
+        return self
+
+    def __exit__(self, *args):
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def imap_unordered(self, fcn, inputs):
+        """Applies the function to each input, yielding results in the order
+        that they complete.
+
+        Args:
+            fcn: a function that accepts a single input
+            inputs: an iterable of inputs
+
+        Returns:
+            a generator of results
+        """
+        inputs = iter(inputs)
+        pending = set()
+        exhausted = False
+
+        # Windows span a single call so that time spent between calls is not
+        # counted against the throughput
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        while True:
+            while not exhausted and len(pending) < self.num_workers:
+                try:
+                    args = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                pending.add(self._executor.submit(fcn, args))
+
+            if not pending:
+                return
+
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                # The tail of a call is not representative of the throughput
+                # that the current concurrency achieves
+                if not exhausted:
+                    self._record_completion()
+
+                yield future.result()
+
+    def _record_completion(self):
+        self._window_count += 1
+        if self._window_count < max(8, 2 * self.num_workers):
+            return
+
+        now = time.monotonic()
+        throughput = self._window_count / max(now - self._window_start, 1e-6)
+        self._update(throughput)
+
+        self._window_start = now
+        self._window_count = 0
+
+    def _update(self, throughput):
+        best_throughput = self._best_throughput
+
+        if (
+            best_throughput is not None
+            and throughput < (1 - self.tolerance) * best_throughput
+        ):
+            self._slow_start = False
+            self.num_workers = max(self.min_workers, self.num_workers // 2)
+
+            # Re-measure the baseline at the new concurrency
+            self._best_throughput = None
+            return
+
+        if self._slow_start:
+            self.num_workers = min(self.max_workers, 2 * self.num_workers)
+        else:
+            self.num_workers = min(self.max_workers, self.num_workers + 1)
+
+        self._best_throughput = max(throughput, best_throughput or 0)
+
+
 class Delegate(foo.Operator):
     @property
     def config(self):
@@ -2226,6 +5202,9 @@ class Delegate(foo.Operator):
         view=None,
         delegation_target=None,
         *args,
+        delegate_shards=None,
+        delegate_reducer=None,
+        delegate_profile=False,
         **kwargs,
     ):
         """Delegates execution of an arbitrary function.
@@ -2268,6 +5247,40 @@ class Delegate(foo.Operator):
                 persistent=True,
             )
 
+            # Run a pipeline of calls in a single delegated operation
+            delegate(
+                [
+                    "compute_metadata",
+                    dict(
+                        fcn="fiftyone.brain.compute_similarity",
+                        kwargs=dict(
+                            model="clip-vit-base32-torch",
+                            embeddings="clip",
+                            brain_key="img_sim",
+                        ),
+                    ),
+                    dict(
+                        fcn="fiftyone.brain.compute_visualization",
+                        kwargs=dict(embeddings="clip", brain_key="img_viz"),
+                    ),
+                ],
+                dataset=dataset,
+            )
+
+            # Split a view into 4 shards that are processed by separate
+            # delegated operations, and then run a reducer on the view
+            delegate(
+                "compute_metadata",
+                view=dataset.match_tags("validation"),
+                delegate_shards=4,
+                delegate_reducer="my_module.summarize",
+            )
+
+            # Store a profile of the call in the operation's result
+            delegate(
+                "compute_metadata", dataset=dataset, delegate_profile=True
+            )
+
         Args:
             fcn: the function to call, which can be either of the following:
 
@@ -2284,10 +5297,33 @@ class Delegate(foo.Operator):
                 -   ``dataset.fcn(*args, **kwargs)``: if a dataset is provided
                 -   ``view.fcn(*args, **kwargs)``: if a view is provided
 
+                Alternatively, this can be a list of steps to run in order
+                against the same collection, where each step is either a
+                function as described above or a dict with ``fcn`` and
+                optional ``args`` and ``kwargs`` keys. Each step reports
+                progress in its own equal slice of the operation's progress,
+                the operation stops at the first failing step, and the
+                duration of each step is stored in the operation's result.
+                In this case, ``*args`` and ``**kwargs`` cannot be provided
             dataset (None): a :class:`fiftyone.core.dataset.Dataset`
             view (None): a :class:`fiftyone.core.view.DatasetView`
             delegation_target (None): an optional orchestrator on which to
                 schedule the operation, if it is delegated
+            delegate_shards (None): an optional number of disjoint slices, by
+                sample ID, into which to split the provided dataset or view.
+                In this case, a delegated operation is scheduled for each
+                shard that runs ``fcn`` on its slice, and this operation
+                tracks their overall progress
+            delegate_reducer (None): the ``"fully.qualified.name"`` of an
+                optional function to call once all shards have completed
+                successfully, as ``reducer(dataset)`` or ``reducer(view)``.
+                Only applicable when ``delegate_shards`` is provided
+            delegate_profile (False): whether to run the operation under
+                ``cProfile`` and ``tracemalloc`` and store its wall time, peak
+                memory, the duration of each step, and its top hotspots by
+                cumulative time in the operation's result. Profiling is always
+                enabled when the ``FIFTYONE_PLUGINS_PROFILE`` environment
+                variable is set on the worker
             progress (None): if ``fcn`` supports a ``progress`` parameter, then
                 you can use this parameter to report the progress of the
                 delegated operation as follows:
@@ -2299,6 +5335,15 @@ class Delegate(foo.Operator):
             *args: JSON-serializable positional arguments for the function
             **kwargs: JSON-serializable keyword arguments for the function
         """
+        if isinstance(fcn, (list, tuple)):
+            if args or kwargs:
+                raise ValueError(
+                    "Arguments must be provided per step when delegating a "
+                    "list of steps"
+                )
+
+            fcn = [_parse_delegate_step(step) for step in fcn]
+
         ctx = dict(dataset=dataset, view=view)
 
         has_dataset = dataset is not None
@@ -2310,6 +5355,9 @@ class Delegate(foo.Operator):
             has_view=has_view,
             args=args,
             kwargs=kwargs,
+            shards=delegate_shards,
+            reducer=delegate_reducer,
+            profile=delegate_profile,
         )
 
         return foo.execute_operator(
@@ -2323,30 +5371,274 @@ class Delegate(foo.Operator):
         return True
 
     def execute(self, ctx):
-        fcn = ctx.params["fcn"]
-        has_dataset = ctx.params["has_dataset"]
-        has_view = ctx.params["has_view"]
-        args = ctx.params["args"]
-        kwargs = ctx.params["kwargs"]
-
-        # Special handling if we find a `progress` kwarg that is float/int
-        progress = kwargs.get("progress", None)
-        if isinstance(progress, float):
-            # Report progress every `progress` seconds
-            set_progress = lambda pb: ctx.set_progress(progress=pb.progress)
-            kwargs["progress"] = fo.report_progress(set_progress, dt=progress)
-        elif isinstance(progress, int):
-            # Report progress every in `progress` equally-spaced increments
-            set_progress = lambda pb: ctx.set_progress(progress=pb.progress)
-            kwargs["progress"] = fo.report_progress(set_progress, n=progress)
+        if _is_profiling(ctx):
+            result, profile = _run_profiled(lambda: self._execute(ctx))
+            return dict(result or {}, profile=profile)
 
-        if has_view:
-            sample_collection = ctx.view
-        elif has_dataset:
-            sample_collection = ctx.dataset
-        else:
-            sample_collection = None
+        return self._execute(ctx)
+
+    def _execute(self, ctx):
+        num_shards = ctx.params.get("shards", None)
+        reducer = ctx.params.get("reducer", None)
+
+        if num_shards:
+            _run_delegate_shards(ctx, self.uri, num_shards, reducer=reducer)
+            return
+
+        return _run_delegate(ctx, ctx.params, ctx.set_progress)
+
+
+def _get_delegate_collection(ctx, params):
+    if params["has_view"]:
+        sample_collection = ctx.view
+    elif params["has_dataset"]:
+        sample_collection = ctx.dataset
+    else:
+        return None
+
+    shard = params.get("shard", None)
+    if shard is not None:
+        sample_collection = _get_shard_view(sample_collection, shard)
+
+    return sample_collection
+
+
+def _run_delegate(ctx, params, set_progress):
+    fcn = params["fcn"]
+    args = params["args"]
+    kwargs = params["kwargs"]
+
+    sample_collection = _get_delegate_collection(ctx, params)
+
+    if not isinstance(fcn, list):
+        _run_delegate_step(set_progress, sample_collection, fcn, args, kwargs)
+        return
+
+    return _run_delegate_steps(set_progress, sample_collection, fcn)
+
+
+def _run_delegate_shards(ctx, operator_uri, num_shards, reducer=None):
+    sample_collection = _get_delegate_collection(ctx, ctx.params)
+    if sample_collection is None:
+        raise ValueError("A dataset or view must be provided to use shards")
+
+    if not _supports_shards():
+        raise ValueError(
+            "Shards require fiftyone>=%s, but found %s"
+            % (_SHARDS_MIN_VERSION, foc.VERSION)
+        )
+
+    shards = _get_shard_ranges(sample_collection, num_shards)
+
+    params = [
+        dict(ctx.params, shard=shard, shards=None, reducer=None)
+        for shard, _ in shards
+    ]
+
+    def run_shard(params, set_progress):
+        _run_delegate(ctx, params, set_progress)
+
+    fcn = ctx.params["fcn"]
+    if isinstance(fcn, list):
+        label = "Delegate pipeline"
+    else:
+        label = f"Delegate {fcn}"
+
+    # This operation is not a generator, and running delegate shards yields
+    # no updates
+    errors = _exhaust(
+        _run_shards(ctx, operator_uri, label, shards, params, run_shard)
+    )
+
+    if errors:
+        idx, error = errors[0]
+        raise ValueError(
+            "%d of %d shards failed. First failure (shard %d):\n%s"
+            % (len(errors), len(shards), idx, error)
+        )
+
+    if reducer is not None:
+        ctx.set_progress(progress=1.0, label=f"Running {reducer}")
+        with _profile_phase(reducer):
+            etau.get_function(reducer)(sample_collection)
+
+
+def _exhaust(generator):
+    while True:
+        try:
+            next(generator)
+        except StopIteration as e:
+            return e.value
+
+
+_PROFILE_ENV_VAR = "FIFTYONE_PLUGINS_PROFILE"
+_DEFAULT_PROFILE_NUM_HOTSPOTS = 25
+
+_profile_local = threading.local()
+
+
+def _is_profiling(ctx):
+    if ctx.params.get("profile", False):
+        return True
+
+    value = os.environ.get(_PROFILE_ENV_VAR, "")
+    return value.lower() in ("1", "true", "yes")
+
+
+def _run_profiled(fcn, num_hotspots=_DEFAULT_PROFILE_NUM_HOTSPOTS):
+    """Runs the given function under ``cProfile`` and ``tracemalloc``.
+
+    Only the calling thread is profiled, so work performed by worker threads
+    and processes is reflected in the wall time of the phase that waits on
+    it rather than in the hotspots.
+
+    Args:
+        fcn: a function that accepts no arguments
+        num_hotspots (25): the number of functions to include in the profile
+
+    Returns:
+        a tuple of
+
+        -   the return value of ``fcn``
+        -   a JSON-serializable dict containing the total wall time, the peak
+            traced memory, the wall time of each phase recorded via
+            :func:`_profile_phase`, and the top hotspots by cumulative time
+    """
+    profiler = cProfile.Profile()
+    phases = {}
+
+    # Don't interfere with callers that are already tracing allocations
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+
+    _profile_local.phases = phases
+    start = time.time()
+    try:
+        result = profiler.runcall(fcn)
+    finally:
+        wall_time = time.time() - start
+        _profile_local.phases = None
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+    stats = pstats.Stats(profiler)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+
+    hotspots = []
+    for func in stats.fcn_list[:num_hotspots]:
+        _, ncalls, tottime, cumtime, _ = stats.stats[func]
+        hotspots.append(
+            dict(
+                function="%s:%d(%s)" % func,
+                ncalls=ncalls,
+                tottime=round(tottime, 3),
+                cumtime=round(cumtime, 3),
+            )
+        )
+
+    profile = dict(
+        wall_time=round(wall_time, 3),
+        peak_memory_bytes=peak_memory,
+        phases={k: round(v, 3) for k, v in phases.items()},
+        hotspots=hotspots,
+    )
+
+    return result, profile
+
+
+@contextlib.contextmanager
+def _profile_phase(name):
+    """Adds the wall time of the block to the named phase of the profile that
+    is currently being recorded by :func:`_run_profiled` in this thread, if
+    any.
+    """
+    phases = getattr(_profile_local, "phases", None)
+    if phases is None:
+        yield
+        return
+
+    start = time.time()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + time.time() - start
+
+
+def _parse_delegate_step(step):
+    if etau.is_str(step):
+        return dict(fcn=step, args=[], kwargs={})
+
+    return dict(
+        fcn=step["fcn"],
+        args=list(step.get("args", None) or []),
+        kwargs=dict(step.get("kwargs", None) or {}),
+    )
+
+
+def _run_delegate_steps(set_progress, sample_collection, steps):
+    num_steps = len(steps)
+
+    results = []
+    for idx, step in enumerate(steps):
+        fcn = step["fcn"]
+        label = f"Step {idx + 1}/{num_steps}: {fcn}"
+        set_progress(progress=idx / num_steps, label=label)
+
+        start = time.time()
+        try:
+            _run_delegate_step(
+                set_progress,
+                sample_collection,
+                fcn,
+                step["args"],
+                step["kwargs"],
+                progress_range=(idx / num_steps, (idx + 1) / num_steps),
+                label=label,
+            )
+        except Exception as e:
+            raise RuntimeError(
+                "Step %d/%d (%s) failed after %.1f seconds"
+                % (idx + 1, num_steps, fcn, time.time() - start)
+            ) from e
+
+        results.append(dict(fcn=fcn, duration=round(time.time() - start, 3)))
+
+    set_progress(progress=1.0, label=f"Completed {num_steps} steps")
+
+    return dict(steps=results)
+
+
+def _run_delegate_step(
+    set_progress,
+    sample_collection,
+    fcn,
+    args,
+    kwargs,
+    progress_range=(0.0, 1.0),
+    label=None,
+):
+    kwargs = dict(kwargs)
+
+    # Progress is reported within the step's slice of the overall progress
+    start, end = progress_range
+    _set_progress = lambda pb: set_progress(
+        progress=start + (end - start) * pb.progress, label=label
+    )
+
+    # Special handling if we find a `progress` kwarg that is float/int
+    progress = kwargs.get("progress", None)
+    if isinstance(progress, float):
+        # Report progress every `progress` seconds
+        kwargs["progress"] = fo.report_progress(_set_progress, dt=progress)
+    elif isinstance(progress, int):
+        # Report progress every in `progress` equally-spaced increments
+        kwargs["progress"] = fo.report_progress(_set_progress, n=progress)
 
+    with _profile_phase(label or fcn):
         if sample_collection is None:
             fcn = etau.get_function(fcn)
             fcn(*args, **kwargs)
@@ -0,0 +1,78 @@
+from utils import _AdaptiveThreadPool
+
+
+def test_slow_start_doubles_workers():
+    """Test that concurrency doubles while throughput keeps improving."""
+    pool = _AdaptiveThreadPool(1, 16)
+
+    for throughput, num_workers in [(10, 2), (20, 4), (40, 8), (80, 16)]:
+        pool._update(throughput)
+        assert pool.num_workers == num_workers
+
+
+def test_drop_halves_workers_and_ends_slow_start():
+    """Test that a throughput drop halves concurrency, after which it grows
+    additively."""
+    pool = _AdaptiveThreadPool(1, 64)
+
+    pool._update(10)
+    pool._update(20)
+    pool._update(40)
+    assert pool.num_workers == 8
+
+    # More than a 10% drop relative to the best throughput
+    pool._update(30)
+    assert pool.num_workers == 4
+
+    # The baseline is re-measured, then concurrency grows by one
+    pool._update(30)
+    assert pool.num_workers == 5
+
+    pool._update(31)
+    assert pool.num_workers == 6
+
+
+def test_drop_within_tolerance_keeps_growing():
+    """Test that small fluctuations in throughput do not shrink the pool."""
+    pool = _AdaptiveThreadPool(1, 64, tolerance=0.1)
+
+    pool._update(100)
+    pool._update(95)
+    assert pool.num_workers == 4
+
+
+def test_workers_clamped_to_bounds():
+    """Test that concurrency never leaves ``[min_workers, max_workers]``."""
+    pool = _AdaptiveThreadPool(2, 5)
+    assert pool.num_workers == 2
+
+    pool._update(10)
+    pool._update(20)
+    assert pool.num_workers == 5
+
+    pool._update(40)
+    assert pool.num_workers == 5
+
+    pool._update(1)
+    assert pool.num_workers == 2
+
+    pool._update(1)
+    pool._update(0.1)
+    assert pool.num_workers == 2
+
+
+def test_invalid_bounds_are_normalized():
+    """Test that the bounds are coerced into a valid range."""
+    pool = _AdaptiveThreadPool(0, -1)
+
+    assert pool.min_workers == 1
+    assert pool.max_workers == 1
+    assert pool.num_workers == 1
+
+
+def test_imap_unordered_returns_all_results():
+    """Test that every input is processed exactly once."""
+    with _AdaptiveThreadPool(1, 4) as pool:
+        results = list(pool.imap_unordered(lambda x: 2 * x, range(100)))
+
+    assert sorted(results) == [2 * x for x in range(100)]
@@ -0,0 +1,127 @@
+import pytest
+
+import fiftyone.core.media as fom
+import fiftyone.core.metadata as fomm
+
+import utils
+from utils import _do_compute_metadata, _MetadataCache
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Fixture to provide the path to a temporary cache database."""
+    return str(tmp_path / "metadata_cache.db")
+
+
+def _make_metadata(width, height):
+    return fomm.ImageMetadata(
+        size_bytes=100,
+        mime_type="image/jpeg",
+        width=width,
+        height=height,
+        num_channels=3,
+    )
+
+
+def test_get_missing(cache_path):
+    """Test that uncached files and files without fingerprints miss."""
+    cache = _MetadataCache(cache_path)
+
+    assert cache.get("/data/a.jpg", (1, 100)) is None
+    assert cache.get("/data/a.jpg", None) is None
+
+    cache.close()
+
+
+def test_add_and_get(cache_path):
+    """Test that cached metadata is returned for unchanged files only."""
+    cache = _MetadataCache(cache_path)
+    cache.add([("/data/a.jpg", (1, 100), _make_metadata(640, 480))])
+
+    metadata = cache.get("/data/a.jpg", (1, 100))
+    assert metadata.width == 640
+    assert metadata.height == 480
+
+    assert cache.get("/data/a.jpg", (2, 100)) is None
+    assert cache.get("/data/a.jpg", (1, 200)) is None
+
+    cache.close()
+
+
+def test_changed_files_replace_entries(cache_path):
+    """Test that each file has one entry per mode."""
+    cache = _MetadataCache(cache_path)
+    cache.add([("/data/a.jpg", (1, 100), _make_metadata(640, 480))])
+    cache.add([("/data/a.jpg", (2, 100), _make_metadata(320, 240))])
+
+    assert cache.get("/data/a.jpg", (1, 100)) is None
+    assert cache.get("/data/a.jpg", (2, 100)).width == 320
+
+    (count,) = cache._conn.execute(
+        "SELECT COUNT(*) FROM metadata_by_mode"
+    ).fetchone()
+    assert count == 1
+
+    cache.close()
+
+
+def test_modes_are_cached_separately(cache_path):
+    """Test that metadata computed in one mode is never returned in
+    another."""
+    header_cache = _MetadataCache(cache_path, mode="header")
+    header_cache.add([("/data/a.jpg", (1, 100), _make_metadata(640, 480))])
+    header_cache.close()
+
+    full_cache = _MetadataCache(cache_path, mode="full")
+    assert full_cache.get("/data/a.jpg", (1, 100)) is None
+
+    full_cache.add([("/data/a.jpg", (1, 100), _make_metadata(480, 640))])
+    assert full_cache.get("/data/a.jpg", (1, 100)).width == 480
+    full_cache.close()
+
+    header_cache = _MetadataCache(cache_path, mode="header")
+    assert header_cache.get("/data/a.jpg", (1, 100)).width == 640
+    header_cache.close()
+
+
+def test_enrichments_are_cached(cache_path, tmp_path, monkeypatch):
+    """Test that cached enrichments are returned without recomputing them,
+    and that missing enrichments are recomputed."""
+    filepath = str(tmp_path / "a.jpg")
+    with open(filepath, "wb") as f:
+        f.write(b"image")
+
+    enrichments_computed = []
+
+    def _get_metadata(filepath, media_type, enrichments=None, **kwargs):
+        enrichments_computed.append(enrichments)
+        metadata = _make_metadata(640, 480)
+        for name in enrichments:
+            metadata[name] = "abc"
+
+        return metadata
+
+    monkeypatch.setattr(utils, "_get_metadata", _get_metadata)
+
+    cache = _MetadataCache(cache_path)
+    args = ("a", filepath, fom.IMAGE, False, None, ["content_hash"], cache)
+
+    _, _, metadata, fingerprint, failure = _do_compute_metadata(args)
+    assert failure is None
+    assert fingerprint is not None
+    cache.add([(filepath, fingerprint, metadata)])
+
+    _, _, metadata, fingerprint, failure = _do_compute_metadata(args)
+    assert failure is None
+    assert fingerprint is None
+    assert metadata.content_hash == "abc"
+    assert enrichments_computed == [["content_hash"]]
+
+    args = ("a", filepath, fom.IMAGE, False, None, ["dhash"], cache)
+
+    _, _, metadata, fingerprint, failure = _do_compute_metadata(args)
+    assert fingerprint is not None
+    assert metadata.dhash == "abc"
+    assert enrichments_computed == [["content_hash"], ["dhash"]]
+
+    cache.close()
@@ -0,0 +1,90 @@
+import io
+import struct
+
+from utils import _probe_image_info, _probe_image_metadata
+
+
+def _probe(data):
+    f = io.BytesIO(data)
+    return _probe_image_info(f, data[:32])
+
+
+def _make_jpeg(width, height, num_channels=3, orientation=None):
+    data = b"\xff\xd8"
+
+    if orientation is not None:
+        tiff = b"MM\x00*" + struct.pack(">I", 8)
+        tiff += struct.pack(">H", 1)
+        tiff += struct.pack(">HHIHH", 0x0112, 3, 1, orientation, 0)
+        tiff += struct.pack(">I", 0)
+        app1 = b"Exif\x00\x00" + tiff
+        data += b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+
+    # A quantization table segment that must be skipped
+    dqt = b"\x00" + bytes(64)
+    data += b"\xff\xdb" + struct.pack(">H", len(dqt) + 2) + dqt
+
+    sof = struct.pack(">BHHB", 8, height, width, num_channels)
+    sof += bytes(3 * num_channels)
+    data += b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof
+    data += b"\xff\xd9"
+
+    return data
+
+
+def _make_png(width, height, color_type):
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr))
+        + b"IHDR"
+        + ihdr
+        + bytes(4)
+    )
+
+
+def test_jpeg():
+    """Test that JPEG dimensions are read from the start of frame marker."""
+    assert _probe(_make_jpeg(640, 480)) == (640, 480, 3)
+    assert _probe(_make_jpeg(32, 16, num_channels=1)) == (32, 16, 1)
+
+
+def test_jpeg_ignores_exif_orientation():
+    """Test that the stored dimensions are reported regardless of EXIF
+    orientation, like a full read."""
+    for orientation in (1, 6, 8):
+        data = _make_jpeg(640, 480, orientation=orientation)
+        assert _probe(data) == (640, 480, 3)
+
+
+def test_png():
+    """Test that PNG dimensions and channels are read from the IHDR chunk."""
+    assert _probe(_make_png(100, 50, 2)) == (100, 50, 3)
+    assert _probe(_make_png(100, 50, 6)) == (100, 50, 4)
+    assert _probe(_make_png(100, 50, 0)) == (100, 50, 1)
+
+
+def test_unsupported_format():
+    """Test that unrecognized formats are not probed."""
+    assert _probe(b"GIF89a" + bytes(26)) is None
+
+
+def test_jpeg_without_frame():
+    """Test that JPEGs that end before a start of frame marker are not
+    probed."""
+    assert _probe(b"\xff\xd8\xff\xd9") is None
+
+
+def test_truncated_headers_fall_back(tmp_path):
+    """Test that truncated headers fall back to a full read rather than
+    raising."""
+    for name, data in [
+        ("a.png", _make_png(100, 50, 2)[:20]),
+        ("b.jpg", _make_jpeg(640, 480)[:-12]),
+        ("c.webp", b"RIFF\x00\x00\x00\x00WEBPVP8L"),
+    ]:
+        filepath = str(tmp_path / name)
+        with open(filepath, "wb") as f:
+            f.write(data)
+
+        assert _probe_image_metadata(filepath) is None
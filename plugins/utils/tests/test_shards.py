@@ -0,0 +1,59 @@
+from unittest.mock import MagicMock
+
+import fiftyone.operators.executor as fooe
+
+import utils
+from utils import _fail_stale_shards
+
+
+def _make_doc(doc_id, run_state, progress=None, updated_at=None):
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.run_state = run_state
+    doc.status.progress = progress
+    doc.updated_at = updated_at
+    return doc
+
+
+def test_fail_stale_shards(monkeypatch):
+    """Test that only running shards without a recent heartbeat are
+    failed."""
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+
+    service = MagicMock()
+    heartbeats = {}
+
+    running = fooe.ExecutionRunState.RUNNING
+    queued = fooe.ExecutionRunState.QUEUED
+
+    docs = [
+        _make_doc("stale", running, progress=0.1),
+        _make_doc("alive", running, progress=0.1),
+        _make_doc("queued", queued),
+    ]
+    assert _fail_stale_shards(service, docs, heartbeats, 60) == 0
+
+    # One shard reports progress, the other is silent for too long
+    now[0] += 61
+    docs[1].status.progress = 0.2
+    assert _fail_stale_shards(service, docs, heartbeats, 60) == 1
+
+    service.set_failed.assert_called_once()
+    assert service.set_failed.call_args[0][0] == "stale"
+
+
+def test_heartbeats_within_timeout(monkeypatch):
+    """Test that silent shards are not failed before the timeout."""
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+
+    service = MagicMock()
+    heartbeats = {}
+
+    docs = [_make_doc("shard", fooe.ExecutionRunState.RUNNING)]
+    _fail_stale_shards(service, docs, heartbeats, 60)
+
+    now[0] += 30
+    assert _fail_stale_shards(service, docs, heartbeats, 60) == 0
+    service.set_failed.assert_not_called()
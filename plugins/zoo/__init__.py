@@ -6,7 +6,13 @@ FiftyOne Zoo operators.
 |
 """
 from collections import defaultdict
+import cProfile
+import functools
+import os
 from packaging.version import Version
+import pstats
+import time
+import tracemalloc
 
 import fiftyone as fo
 import fiftyone.brain as fob
@@ -587,6 +593,72 @@ def _partial_download_inputs(ctx, inputs, zoo_dataset):
     )
 
 
+_PROFILE_ENV_VAR = "FIFTYONE_PLUGINS_PROFILE"
+_PROFILE_NUM_HOTSPOTS = 25
+
+
+def _profile_execute(execute):
+    """Decorates an operator's ``execute()`` method so that, when a delegated
+    execution is profiled, it runs under ``cProfile`` and ``tracemalloc`` and
+    returns its wall time, peak traced memory, and top hotspots by cumulative
+    time in a ``profile`` key of its result.
+
+    Profiling is enabled via a ``profile`` parameter or by setting the
+    ``FIFTYONE_PLUGINS_PROFILE`` environment variable on the worker.
+    """
+
+    @functools.wraps(execute)
+    def wrapper(self, ctx):
+        env = os.environ.get(_PROFILE_ENV_VAR, "").lower()
+        if not ctx.delegated or not (
+            ctx.params.get("profile", False) or env in ("1", "true", "yes")
+        ):
+            return execute(self, ctx)
+
+        profiler = cProfile.Profile()
+
+        # Don't interfere with callers that are already tracing allocations
+        was_tracing = tracemalloc.is_tracing()
+        if was_tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+
+        start = time.time()
+        try:
+            result = profiler.runcall(execute, self, ctx)
+        finally:
+            wall_time = time.time() - start
+            _, peak_memory = tracemalloc.get_traced_memory()
+            if not was_tracing:
+                tracemalloc.stop()
+
+        stats = pstats.Stats(profiler)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+
+        hotspots = []
+        for func in stats.fcn_list[:_PROFILE_NUM_HOTSPOTS]:
+            _, ncalls, tottime, cumtime, _ = stats.stats[func]
+            hotspots.append(
+                dict(
+                    function="%s:%d(%s)" % func,
+                    ncalls=ncalls,
+                    tottime=round(tottime, 3),
+                    cumtime=round(cumtime, 3),
+                )
+            )
+
+        profile = dict(
+            wall_time=round(wall_time, 3),
+            peak_memory_bytes=peak_memory,
+            hotspots=hotspots,
+        )
+
+        return dict(result or {}, profile=profile)
+
+    return wrapper
+
+
 class ApplyZooModel(foo.Operator):
     @property
     def config(self):
@@ -610,6 +682,7 @@ class ApplyZooModel(foo.Operator):
         view = types.View(label="Apply zoo model")
         return types.Property(inputs, view=view)
 
+    @_profile_execute
     def execute(self, ctx):
         target = ctx.params.get("target", None)
         model = ctx.params["model"]
@@ -1218,6 +1291,17 @@ def _apply_zoo_model_inputs(ctx, inputs):
             view=file_explorer,
         )
 
+    inputs.bool(
+        "profile",
+        default=False,
+        label="Profile",
+        description=(
+            "Whether to profile this operation when it is delegated. The "
+            "wall time, peak memory, and top hotspots of the run are stored "
+            "in the operation's result"
+        ),
+    )
+
     return True
 
 